@@ -1,11 +1,25 @@
+import numpy as np
 import pygame
-import sys
+
+from baseEnv.pacer import FramePacer
 
 
 class Env:
     """
     Description:
-        Base class for environments
+        Base class for environments.
+        The environment runs headless until the first call to render, so
+        reset and step never touch pygame while training.
+        Subclasses can render with dirty rectangles: draw_background draws
+        the static parts once, begin_frame restores the background under
+        the previous frame's objects and submit_rects records what was drawn,
+        so render only pushes the changed rectangles to the display. Parts
+        of the background that change now and then, like a score, are drawn
+        again when get_background_key changes.
+        render(mode="rgb_array") draws on an offscreen surface instead and
+        returns its pixels as a NumPy view, without opening a window.
+        close releases the window and surfaces but keeps the process and
+        pygame running, a closed environment can be reset and used again.
 
     Parameters:
         envName (str): The name of the environment
@@ -21,27 +35,232 @@ class Env:
         self.running = False
         self.window_size = (width, height)
         self.reward = None
+        # Random number generator of this environment, see reset
+        self.np_random = np.random.default_rng()
+        # Visibility requested on reset and the one the window was created with
+        self.show_display = pygame.SHOWN
+        self.display_flags = None
+        # Paces render calls, runs at max speed unless a subclass sets a rate
+        self.pacer = FramePacer()
+        # Dirty rectangle rendering: cached static background, rects drawn
+        # over it on the last frame (None redraws the whole display) and
+        # rects to push to the display on the next render (None flips it all)
+        self.background = None
+        self.drawn_rects = None
+        self.dirty_rects = None
+        # get_background_key the background was drawn for, rects of its
+        # changing parts and rects of it that changed since the last frame
+        self.background_key = None
+        self.background_rects = []
+        self.background_changes = []
+        # rgb_array rendering: offscreen surface, (width, height) of the
+        # returned frames (the window size if None), surface the frames are
+        # copied to and its pixel view
+        self.offscreen = None
+        self.rgb_array_size = None
+        self.frame_surface = None
+        self.frame = None
 
     def step(self, action):
         pass
 
-    def reset(self, show_display=pygame.SHOWN):
+    def reset(self, show_display=pygame.SHOWN, seed=None):
         """
         Description:
-            Resets the environment to its initial state
+            Resets the environment to its initial state.
+            The window is not created here, it is created lazily by
+            get_display the first time the environment is rendered.
+
+        Parameters:
+            show_display (int): pygame.SHOWN or pygame.HIDDEN
+            seed (int): If given, reseeds np_random so the following episodes
+                are reproducible
         """
-        pygame.init()
-        pygame.display.set_caption(self.envName)
-        self.env = pygame.display.set_mode(
-            self.window_size, pygame.HWSURFACE | pygame.DOUBLEBUF | show_display
-        )
+        if seed is not None:
+            self.np_random = np.random.default_rng(seed)
+        self.show_display = show_display
         self.running = True
 
-    def render(self):
+    def get_display(self):
         """
         Description:
-            Renders the environment
+            Returns the display surface, initializing pygame and creating the
+            window on first use or when the requested visibility changed
+
+        Returns:
+            env (pygame.Surface): The display surface
+        """
+        if self.env is None or self.display_flags != self.show_display:
+            pygame.init()
+            pygame.display.set_caption(self.envName)
+            self.env = pygame.display.set_mode(
+                self.window_size,
+                pygame.HWSURFACE | pygame.DOUBLEBUF | self.show_display,
+            )
+            self.display_flags = self.show_display
+            self.drawn_rects = None
+        return self.env
+
+    def draw_background(self, surface):
+        """
+        Description:
+            Draws the static parts of the environment. The result is cached
+            by get_background, it is only drawn again when
+            get_background_key changes
+
+        Parameters:
+            surface (pygame.Surface): The surface to draw on
+
+        Returns:
+            rects (list(pygame.Rect)): Optional, the areas of the parts that
+                depend on get_background_key
         """
+        surface.fill((0, 0, 0))
+
+    def get_background_key(self):
+        """
+        Description:
+            Returns the state of the parts of the background that change
+            now and then, like a score. None for a background that never
+            changes
+
+        Returns:
+            key: Any value comparable with ==
+        """
+        return None
+
+    def get_background(self):
+        """
+        Description:
+            Returns the static background, drawn on first use and again when
+            get_background_key changes. The next begin_frame restores the
+            areas that changed on the display
+
+        Returns:
+            background (pygame.Surface): The background surface
+        """
+        key = self.get_background_key()
+        if self.background is None:
+            self.background = pygame.Surface(self.window_size)
+        elif key == self.background_key:
+            return self.background
+        else:
+            self.background_changes.extend(self.background_rects)
+
+        self.background_rects = list(self.draw_background(self.background) or [])
+        self.background_changes.extend(self.background_rects)
+        self.background_key = key
+        return self.background
+
+    def begin_frame(self):
+        """
+        Description:
+            Starts a dirty rectangle frame. Restores the background under
+            the rects drawn on the previous frame and where the background
+            changed, or on the whole display the first time, and marks them
+            dirty
+
+        Returns:
+            env (pygame.Surface): The display surface to draw on
+        """
+        display = self.get_display()
+        background = self.get_background()
+
+        if self.drawn_rects is None:
+            display.blit(background, (0, 0))
+            self.mark_dirty([display.get_rect()])
+        else:
+            rects = self.drawn_rects + self.background_changes
+            for rect in rects:
+                display.blit(background, rect, rect)
+            self.mark_dirty(rects)
+
+        self.drawn_rects = []
+        self.background_changes = []
+        return display
+
+    def submit_rects(self, rects):
+        """
+        Description:
+            Records rects drawn over the background on this frame. They are
+            pushed to the display on render and restored on the next frame
+
+        Parameters:
+            rects (list(pygame.Rect)): The rects that were drawn
+        """
+        self.drawn_rects.extend(rects)
+        self.mark_dirty(rects)
+
+    def mark_dirty(self, rects):
+        """
+        Description:
+            Pushes rects to the display on the next render
+
+        Parameters:
+            rects (list(pygame.Rect)): The rects that changed
+        """
+        if self.dirty_rects is None:
+            self.dirty_rects = []
+        self.dirty_rects.extend(rects)
+
+    def get_offscreen(self):
+        """
+        Description:
+            Returns the offscreen surface rgb_array frames are drawn on
+
+        Returns:
+            offscreen (pygame.Surface): The offscreen surface
+        """
+        if self.offscreen is None:
+            self.offscreen = pygame.Surface(self.window_size)
+        return self.offscreen
+
+    def get_frame(self):
+        """
+        Description:
+            Copies the offscreen surface to the frame surface, downscaled to
+            rgb_array_size if it is set, and returns the pixels of the frame
+            surface. The frame surface and its pixel view are reused on every
+            render, so the returned array is overwritten by the next render.
+            The view keeps the frame surface locked, so it is never drawn on
+            directly, pygame can't blit on a locked surface.
+
+        Returns:
+            frame (np.ndarray): (height, width, 3) uint8 array
+        """
+        size = tuple(self.rgb_array_size or self.window_size)
+        if self.frame_surface is None or self.frame_surface.get_size() != size:
+            self.frame_surface = pygame.Surface(size)
+            self.frame = pygame.surfarray.pixels3d(self.frame_surface).transpose(
+                1, 0, 2
+            )
+
+        if size == self.offscreen.get_size():
+            pygame.transform.scale(self.offscreen, size, self.frame_surface)
+        else:
+            pygame.transform.smoothscale(self.offscreen, size, self.frame_surface)
+        return self.frame
+
+    def render(self, mode="human"):
+        """
+        Description:
+            Renders the environment. Subclasses draw the frame and then call
+            this method
+
+        Parameters:
+            mode (str): "human" shows the frame on the window, "rgb_array"
+                returns the frame drawn on the offscreen surface
+
+        Returns:
+            frame (np.ndarray): The frame from get_frame in "rgb_array" mode
+        """
+        if mode == "rgb_array":
+            return self.get_frame()
+        elif mode != "human":
+            raise ValueError(f"Unknown render mode '{mode}'")
+
+        self.get_display()
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
@@ -49,8 +268,42 @@ class Env:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
 
-        pygame.display.flip()
+        if self.dirty_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.dirty_rects)
+            self.dirty_rects = None
+
+        self.pacer.tick()
 
     def close(self):
-        pygame.quit()
-        sys.exit()
+        """
+        Description:
+            Releases the window and the surfaces of the environment and stops
+            it. Only closes the window if it is still this environment's,
+            pygame itself is left initialized for the rest of the process.
+            The environment can be reset and rendered again, it recreates
+            what it needs on first use
+        """
+        # Release the pixel view first, it keeps the frame surface locked
+        self.frame = None
+        self.frame_surface = None
+        self.offscreen = None
+        self.background = None
+        self.background_key = None
+        self.background_rects = []
+        self.background_changes = []
+        self.drawn_rects = None
+        self.dirty_rects = None
+
+        if self.env is not None and pygame.display.get_surface() is self.env:
+            pygame.display.quit()
+        self.env = None
+        self.display_flags = None
+        self.running = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
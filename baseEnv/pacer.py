@@ -0,0 +1,68 @@
+import pygame
+
+
+class FramePacer:
+    """
+    Description:
+        Paces rendered frames. Built on pygame.time.Clock, which only waits
+        for the part of the frame time that drawing did not already use.
+
+        Modes:
+            REALTIME: One frame per simulation step, at realtime_fps
+            MAX_SPEED: No waiting at all
+            FIXED: A user chosen frame rate
+
+    Parameters:
+        realtime_fps (float): Frame rate at which rendering matches the
+            simulation, None if the environment has no time step
+    """
+
+    REALTIME = "realtime"
+    MAX_SPEED = "max_speed"
+    FIXED = "fixed"
+
+    def __init__(self, realtime_fps=None):
+        self.realtime_fps = realtime_fps
+        self.mode = FramePacer.MAX_SPEED
+        self.fps = None
+        self._clock = pygame.time.Clock()
+
+        if realtime_fps is not None:
+            self.set_mode(FramePacer.REALTIME)
+
+    def set_mode(self, mode, fps=None):
+        """
+        Description:
+            Changes the pacing mode
+
+        Parameters:
+            mode (str): FramePacer.REALTIME, FramePacer.MAX_SPEED or
+                FramePacer.FIXED
+            fps (float): Frame rate of FramePacer.FIXED
+        """
+        if mode == FramePacer.REALTIME:
+            if self.realtime_fps is None:
+                raise ValueError("This environment has no realtime frame rate")
+            fps = self.realtime_fps
+        elif mode == FramePacer.FIXED:
+            if not fps or fps <= 0:
+                raise ValueError("FramePacer.FIXED needs a positive fps")
+        elif mode == FramePacer.MAX_SPEED:
+            fps = None
+        else:
+            raise ValueError(f"Unknown pacing mode '{mode}'")
+
+        self.mode = mode
+        self.fps = fps
+
+    def tick(self):
+        """
+        Description:
+            Waits until the current frame has lasted 1 / fps seconds
+
+        Returns:
+            frame_time (int): Milliseconds since the previous tick
+        """
+        if self.fps is None:
+            return self._clock.tick()
+        return self._clock.tick(self.fps)
@@ -0,0 +1,344 @@
+import contextlib
+import multiprocessing
+import numpy as np
+import pygame
+import threading
+import traceback
+from multiprocessing import shared_memory
+
+
+def _worker(conn, make_env, start, stop, shm_names, spaces):
+    """
+    Description:
+        Runs the environments [start, stop) of a pool in a worker process.
+        Reads their actions from and writes their results to the shared
+        arrays, the pipe only carries commands and acknowledgements.
+
+    Parameters:
+        conn (multiprocessing.connection.Connection): Pipe to the pool
+        make_env (callable): Builds one environment
+        start (int): Index of the first environment of this worker
+        stop (int): Index after the last environment of this worker
+        shm_names (dict): Array name -> shared memory block name
+        spaces (dict): Array name -> (shape, dtype)
+    """
+    blocks = {}
+    try:
+        arrays = {}
+        for name, (shape, dtype) in spaces.items():
+            blocks[name] = shared_memory.SharedMemory(name=shm_names[name])
+            arrays[name] = np.ndarray(shape, dtype, buffer=blocks[name].buf)
+        actions = arrays["actions"]
+        observations = arrays["observations"]
+        final_observations = arrays["final_observations"]
+        rewards = arrays["rewards"]
+        dones = arrays["dones"]
+
+        envs = [make_env() for _ in range(start, stop)]
+
+        while True:
+            command, seeds = conn.recv()
+            if command == "step":
+                for i, env in enumerate(envs, start):
+                    observation, reward, done = env.step(actions[i].tolist())
+                    final_observations[i] = observation
+                    rewards[i] = reward
+                    dones[i] = done
+                    # Reset finished environments in place, like the vector envs
+                    if done:
+                        observation = env.reset(pygame.HIDDEN)
+                    observations[i] = observation
+            elif command == "reset":
+                for i, env in enumerate(envs, start):
+                    observations[i] = env.reset(pygame.HIDDEN, seeds[i - start])
+                final_observations[start:stop] = observations[start:stop]
+            elif command == "close":
+                break
+            conn.send(None)
+    except Exception:
+        conn.send(traceback.format_exc())
+    finally:
+        for block in blocks.values():
+            block.close()
+        conn.close()
+
+
+class SubprocEnvPool:
+    """
+    Description:
+        Runs num_envs environments spread over worker processes. The actions,
+        observations, rewards and done flags of the whole batch live in
+        multiprocessing.shared_memory arrays: step writes the actions, tells
+        every worker to step its environments and returns the arrays the
+        workers wrote to, so no batch data is pickled. Environments that
+        finish are reset on the same step, the observation they finished in
+        is kept in final_observations.
+
+        The returned arrays are views of the shared memory, overwritten by
+        the next step or reset.
+
+    Parameters:
+        make_env (callable): Builds one environment, e.g.
+            functools.partial(CartpoleEnv, "Cartpole"). Must be picklable
+            when the start method is not fork
+        num_envs (int): The number of environments
+        num_workers (int): The number of worker processes, one per core if
+            None, never more than num_envs
+        action_shape (tuple): Shape of the action of one environment, e.g.
+            (2,) for the two players of FootballEnv
+        context (str): multiprocessing start method, the default one if None
+    """
+
+    def __init__(
+        self, make_env, num_envs, num_workers=None, action_shape=(), context=None
+    ):
+        self.num_envs = num_envs
+        self.num_workers = min(num_workers or multiprocessing.cpu_count(), num_envs)
+
+        # One environment in this process tells the shapes of the arrays,
+        # closed once they are read
+        with make_env() as probe:
+            self.action_space = probe.action_space
+            observation = np.asarray(probe.reset(pygame.HIDDEN), dtype=np.float64)
+            _, reward, _ = probe.step(np.zeros(action_shape, dtype=np.int64).tolist())
+        reward = np.asarray(reward, dtype=np.float64)
+
+        spaces = {
+            "actions": ((num_envs,) + tuple(action_shape), np.int64),
+            "observations": ((num_envs,) + observation.shape, np.float64),
+            "final_observations": ((num_envs,) + observation.shape, np.float64),
+            "rewards": ((num_envs,) + reward.shape, np.float64),
+            "dones": ((num_envs,), np.bool_),
+        }
+
+        self._blocks = {}
+        arrays = {}
+        for name, (shape, dtype) in spaces.items():
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            self._blocks[name] = shared_memory.SharedMemory(create=True, size=size)
+            arrays[name] = np.ndarray(shape, dtype, buffer=self._blocks[name].buf)
+        self.actions = arrays["actions"]
+        self.observations = arrays["observations"]
+        self.final_observations = arrays["final_observations"]
+        self.rewards = arrays["rewards"]
+        self.dones = arrays["dones"]
+
+        # Contiguous slices of environments, one per worker
+        bounds = np.linspace(0, num_envs, self.num_workers + 1).astype(int)
+        self._slices = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+        ctx = multiprocessing.get_context(context)
+        shm_names = {name: block.name for name, block in self._blocks.items()}
+        self._conns = []
+        self._processes = []
+        for start, stop in self._slices:
+            conn, worker_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(worker_conn, make_env, start, stop, shm_names, spaces),
+                daemon=True,
+            )
+            process.start()
+            worker_conn.close()
+            self._conns.append(conn)
+            self._processes.append(process)
+
+        self._waiting = False
+        self.closed = False
+
+    def reset(self, seed=None):
+        """
+        Description:
+            Resets every environment. Each one is seeded with its own stream
+            derived from seed
+
+        Parameters:
+            seed (int): Root seed of the environments, unseeded if None
+
+        Returns:
+            observations (np.ndarray): (num_envs, *obs_shape) observations
+        """
+        if seed is None:
+            seeds = [None] * self.num_envs
+        else:
+            seeds = [
+                int(seq.generate_state(1)[0])
+                for seq in np.random.SeedSequence(seed).spawn(self.num_envs)
+            ]
+
+        for conn, (start, stop) in zip(self._conns, self._slices):
+            conn.send(("reset", seeds[start:stop]))
+        self._wait_workers()
+        return self.observations
+
+    def step_async(self, actions):
+        """
+        Description:
+            Starts stepping every environment, step_wait returns the results.
+            The learner can work while the workers step
+
+        Parameters:
+            actions (np.ndarray): (num_envs, *action_shape) actions
+        """
+        self.actions[...] = actions
+        for conn in self._conns:
+            conn.send(("step", None))
+        self._waiting = True
+
+    def step_wait(self):
+        """
+        Description:
+            Waits for the step started by step_async
+
+        Returns:
+            observations (np.ndarray): (num_envs, *obs_shape) observations,
+                finished environments already hold their reset observation
+            rewards (np.ndarray): (num_envs, *reward_shape) rewards
+            dones (np.ndarray): (num_envs,) bool array, True where the episode
+                ended on this step
+        """
+        self._waiting = False
+        self._wait_workers()
+        return self.observations, self.rewards, self.dones
+
+    def step(self, actions):
+        """
+        Description:
+            Steps every environment
+
+        Parameters:
+            actions (np.ndarray): (num_envs, *action_shape) actions
+
+        Returns:
+            observations, rewards, dones: See step_wait
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        """Stops the workers and frees the shared memory."""
+        if self.closed:
+            return
+        if self._waiting:
+            self._waiting = False
+            try:
+                self._wait_workers()
+            except RuntimeError:
+                pass
+        for conn, process in zip(self._conns, self._processes):
+            if process.is_alive():
+                try:
+                    conn.send(("close", None))
+                except (BrokenPipeError, OSError):
+                    pass
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+
+        # Drop the views before releasing the memory under them
+        self.actions = self.observations = self.final_observations = None
+        self.rewards = self.dones = None
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self.closed = True
+
+    def _wait_workers(self):
+        """Wait until every worker acknowledged its command."""
+        errors = []
+        for conn in self._conns:
+            try:
+                error = conn.recv()
+            except (EOFError, OSError):
+                error = "The worker process exited"
+            if error is not None:
+                errors.append(error)
+        if errors:
+            raise RuntimeError("Environment worker failed:\n" + errors[0])
+
+
+class EnvInstancePool:
+    """
+    Description:
+        Keeps built environments to hand out again, for long-lived processes
+        like sweep workers or evaluation services that use one environment
+        per task. acquire resets an idle environment in place, or builds one
+        if none is idle, and release puts it back, so each environment, its
+        surfaces and its window are only created once. Environments released
+        while max_idle are already idle are closed instead.
+
+    Parameters:
+        make_env (callable): Builds one environment, e.g.
+            functools.partial(CartpoleEnv, "Cartpole")
+        size (int): The number of environments to build up front
+        max_idle (int): The most idle environments to keep, no limit if None
+    """
+
+    def __init__(self, make_env, size=0, max_idle=None):
+        self.make_env = make_env
+        self.max_idle = max_idle
+        self.idle = [make_env() for _ in range(size)]
+        # Number of environments built, to see how many acquire reused
+        self.created = size
+        self.lock = threading.Lock()
+
+    def acquire(self, show_display=pygame.HIDDEN, seed=None):
+        """
+        Description:
+            Returns a reset environment, idle or new
+
+        Parameters:
+            show_display (int): pygame.SHOWN or pygame.HIDDEN
+            seed (int): If given, reseeds the environment's np_random
+
+        Returns:
+            env (Env): The environment, to give back with release
+        """
+        with self.lock:
+            env = self.idle.pop() if self.idle else None
+            if env is None:
+                self.created += 1
+        if env is None:
+            env = self.make_env()
+        env.reset(show_display, seed)
+        return env
+
+    def release(self, env):
+        """
+        Description:
+            Gives back an environment from acquire
+
+        Parameters:
+            env (Env): The environment
+        """
+        env.running = False
+        with self.lock:
+            if self.max_idle is None or len(self.idle) < self.max_idle:
+                self.idle.append(env)
+                return
+        env.close()
+
+    @contextlib.contextmanager
+    def env(self, show_display=pygame.HIDDEN, seed=None):
+        """
+        Description:
+            Context manager that acquires an environment and releases it on
+            exit
+
+        Parameters:
+            show_display (int): pygame.SHOWN or pygame.HIDDEN
+            seed (int): If given, reseeds the environment's np_random
+        """
+        env = self.acquire(show_display, seed)
+        try:
+            yield env
+        finally:
+            self.release(env)
+
+    def close(self):
+        """Closes the idle environments."""
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for env in idle:
+            env.close()
@@ -0,0 +1,256 @@
+import numpy as np
+import os
+import pygame
+import queue
+import shutil
+import subprocess
+import threading
+
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".avi", ".mov", ".webm")
+
+
+class ImageSequenceWriter:
+    """
+    Description:
+        Writes frames as numbered PNG images in a directory
+
+    Parameters:
+        directory (str): Directory of the images, created if missing
+        pattern (str): File name of each image, formatted with the frame number
+    """
+
+    def __init__(self, directory, pattern="frame_{:06d}.png"):
+        self.directory = directory
+        self.pattern = pattern
+        self.frame_count = 0
+
+    def open(self, frame_shape):
+        """
+        Description:
+            Prepares the writer for frames of the given shape
+
+        Parameters:
+            frame_shape (tuple): (height, width, 3) shape of the frames
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.size = (frame_shape[1], frame_shape[0])
+        self.frame_count = 0
+
+    def write(self, frame):
+        """
+        Description:
+            Writes one frame
+
+        Parameters:
+            frame (np.ndarray): C-contiguous (height, width, 3) uint8 array
+        """
+        # frombuffer wraps the array without copying it
+        image = pygame.image.frombuffer(frame, self.size, "RGB")
+        path = os.path.join(self.directory, self.pattern.format(self.frame_count))
+        pygame.image.save(image, path)
+        self.frame_count += 1
+
+    def close(self):
+        """Nothing to release, every image is already on disk."""
+
+
+class FfmpegWriter:
+    """
+    Description:
+        Encodes frames into a video file by piping raw RGB frames to an
+        ffmpeg process. ffmpeg must be on the PATH.
+
+    Parameters:
+        path (str): Video file, the container follows its extension
+        fps (float): Frame rate of the video
+    """
+
+    def __init__(self, path, fps):
+        self.path = path
+        self.fps = fps
+        self.process = None
+
+        if shutil.which("ffmpeg") is None:
+            raise RuntimeError("FfmpegWriter needs ffmpeg on the PATH")
+
+    def open(self, frame_shape):
+        """
+        Description:
+            Starts the ffmpeg process for frames of the given shape
+
+        Parameters:
+            frame_shape (tuple): (height, width, 3) shape of the frames
+        """
+        height, width = frame_shape[:2]
+        self.process = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "rawvideo",
+                "-pix_fmt",
+                "rgb24",
+                "-s",
+                f"{width}x{height}",
+                "-r",
+                str(self.fps),
+                "-i",
+                "-",
+                # Most codecs need even dimensions
+                "-vf",
+                "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+                "-pix_fmt",
+                "yuv420p",
+                self.path,
+            ],
+            stdin=subprocess.PIPE,
+        )
+
+    def write(self, frame):
+        """
+        Description:
+            Writes one frame
+
+        Parameters:
+            frame (np.ndarray): C-contiguous (height, width, 3) uint8 array
+        """
+        self.process.stdin.write(frame.data)
+
+    def close(self):
+        """Waits for ffmpeg to finish the video."""
+        if self.process is None:
+            return
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to write {self.path}")
+        self.process = None
+
+
+class FrameRecorder:
+    """
+    Description:
+        Streams frames to a writer on a background thread, so the simulation
+        does not wait for encoding or disk writes. Frames are copied into a
+        fixed pool of queue_size buffers allocated on the first frame, which
+        bounds the memory used by frames waiting to be written.
+
+        When every buffer is waiting to be written, record either drops the
+        frame (block=False) or waits for the writer (block=True).
+
+    Parameters:
+        writer: ImageSequenceWriter, FfmpegWriter or any object with
+            open(frame_shape), write(frame) and close() methods
+        queue_size (int): Number of frame buffers
+        block (bool): Wait for a free buffer instead of dropping frames
+    """
+
+    def __init__(self, writer, queue_size=64, block=False):
+        self.writer = writer
+        self.queue_size = queue_size
+        self.block = block
+        self.recorded_frames = 0
+        self.dropped_frames = 0
+
+        self._buffers = None
+        self._free = queue.Queue()
+        self._filled = queue.Queue()
+        self._thread = None
+        self._error = None
+
+    def record(self, frame):
+        """
+        Description:
+            Queues a copy of a frame to be written, like the frames returned
+            by Env.render(mode="rgb_array")
+
+        Parameters:
+            frame (np.ndarray): (height, width, 3) uint8 array
+
+        Returns:
+            recorded (bool): False if the frame was dropped
+        """
+        self._raise_writer_error()
+
+        if self._buffers is None:
+            self._start(frame.shape)
+
+        try:
+            index = self._free.get(block=self.block)
+        except queue.Empty:
+            self.dropped_frames += 1
+            return False
+        if index is None:
+            # The writer thread failed while record was waiting
+            self._free.put(None)
+            self._raise_writer_error()
+
+        np.copyto(self._buffers[index], frame)
+        self._filled.put(index)
+        self.recorded_frames += 1
+        return True
+
+    def close(self):
+        """
+        Description:
+            Writes the queued frames and closes the writer. Raises the error
+            of the writer thread if it failed
+        """
+        if self._thread is not None:
+            self._filled.put(None)
+            self._thread.join()
+            self._thread = None
+        self._raise_writer_error()
+
+    def _start(self, frame_shape):
+        """Allocate the frame buffers, open the writer and start its thread."""
+        self._buffers = np.empty((self.queue_size,) + frame_shape, dtype=np.uint8)
+        for index in range(self.queue_size):
+            self._free.put(index)
+
+        self.writer.open(frame_shape)
+        self._thread = threading.Thread(target=self._write_frames, daemon=True)
+        self._thread.start()
+
+    def _write_frames(self):
+        """Writer thread: write the filled buffers until close is called."""
+        try:
+            while True:
+                index = self._filled.get()
+                if index is None:
+                    break
+                self.writer.write(self._buffers[index])
+                self._free.put(index)
+        except Exception as error:
+            self._error = error
+            # Wake up record if it waits on buffers that will never be freed
+            self._free.put(None)
+        finally:
+            try:
+                self.writer.close()
+            except Exception as error:
+                self._error = self._error or error
+
+    def _raise_writer_error(self):
+        """Re-raise an error of the writer thread in the caller's thread."""
+        if self._error is not None:
+            raise RuntimeError("Writing the recorded frames failed") from self._error
+
+
+def make_writer(path, fps):
+    """
+    Description:
+        Picks the writer for a path: FfmpegWriter for a video file,
+        ImageSequenceWriter for anything else, treated as a directory
+
+    Parameters:
+        path (str): Video file or image directory
+        fps (float): Frame rate of a video
+
+    Returns:
+        writer: The writer of path
+    """
+    if path.lower().endswith(VIDEO_EXTENSIONS):
+        return FfmpegWriter(path, fps)
+    return ImageSequenceWriter(path)
@@ -0,0 +1,317 @@
+import asyncio
+import numpy as np
+import pygame
+import socket
+import struct
+
+# Every message starts with this header: message type, status, two unused
+# bytes and the length of the payload that follows, all little-endian
+HEADER = struct.Struct("<BBxxI")
+
+# Message types
+INFO = 0
+RESET = 1
+STEP = 2
+
+# Statuses
+OK = 0
+ERROR = 1
+
+# INFO reply payload: sizes of the observation, action and reward, and
+# whether the reward is a scalar
+INFO_PAYLOAD = struct.Struct("<IIIB")
+
+
+class EnvServer:
+    """
+    Description:
+        Serves the sub-environments of a vector environment, like
+        VectorCartpoleEnv or VectorFootballEnv, to clients over a Unix or TCP
+        socket. Each connection gets its own sub-environment. Step requests
+        that arrive together, from any connection, are coalesced into one
+        vectorized step of the sub-environments that asked for it.
+
+        Messages are a fixed-size HEADER followed by a raw payload:
+            INFO: empty request, INFO_PAYLOAD reply
+            RESET: empty request, float64 observation reply
+            STEP: int64 action request, float64 observation, float64 reward
+                and uint8 done reply
+        An ERROR status reply carries a UTF-8 message. Finished episodes are
+        reset on the same step, like in the vector environments. Actions out
+        of range are refused before they are queued, and if a batch still
+        fails its requests are stepped one by one, so only the failing ones
+        get the error.
+
+    Parameters:
+        env: Vector environment with num_envs, reset, reset_envs and a step
+            taking (actions, indices). num_envs is the maximum number of
+            clients
+        action_shape (tuple): Shape of the action of one sub-environment,
+            e.g. (2,) for VectorFootballEnv
+        batch_delay (float): Seconds to wait for more requests before
+            stepping a batch, 0 only batches requests that are already there
+        seed (int): Seed of the environment
+    """
+
+    def __init__(self, env, action_shape=(), batch_delay=0.0, seed=None):
+        self.env = env
+        self.action_shape = tuple(action_shape)
+        self.batch_delay = batch_delay
+
+        # A first step tells the reward shape, then start over
+        observation = env.reset(pygame.HIDDEN)
+        _, reward, _ = env.step(
+            np.zeros((env.num_envs,) + self.action_shape, dtype=np.int64)
+        )
+        env.reset(pygame.HIDDEN, seed)
+
+        self.obs_size = int(np.prod(observation.shape[1:]))
+        self.action_size = int(np.prod(self.action_shape))
+        self.num_actions = len(env.action_space)
+        self.reward_size = int(np.prod(reward.shape[1:]))
+        self.info = INFO_PAYLOAD.pack(
+            self.obs_size, self.action_size, self.reward_size, reward.ndim == 1
+        )
+
+        self.free_slots = list(range(env.num_envs - 1, -1, -1))
+        self.pending = []
+        self.batch_task = None
+        # Number of batches stepped and of steps they held
+        self.batches = 0
+        self.batched_steps = 0
+
+    async def start_unix(self, path):
+        """Start serving on a Unix socket, returns the asyncio.Server."""
+        return await asyncio.start_unix_server(self.handle_client, path)
+
+    async def start_tcp(self, host="127.0.0.1", port=0):
+        """Start serving on a TCP socket, returns the asyncio.Server."""
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def handle_client(self, reader, writer):
+        """
+        Description:
+            Serves one connection, one request at a time, until it closes
+
+        Parameters:
+            reader (asyncio.StreamReader): Reads the requests
+            writer (asyncio.StreamWriter): Writes the replies
+        """
+        if not self.free_slots:
+            self.write_message(writer, INFO, ERROR, b"No free environment")
+            writer.close()
+            return
+
+        slot = self.free_slots.pop()
+        self.env.reset_envs(np.array([slot]))
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                message_type, _, length = HEADER.unpack(header)
+                payload = await reader.readexactly(length)
+
+                try:
+                    reply = await self.handle_request(slot, message_type, payload)
+                    self.write_message(writer, message_type, OK, reply)
+                except Exception as error:
+                    message = f"{type(error).__name__}: {error}".encode()
+                    self.write_message(writer, message_type, ERROR, message)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.free_slots.append(slot)
+            writer.close()
+
+    async def handle_request(self, slot, message_type, payload):
+        """Return the reply payload of one request of the client of slot."""
+        if message_type == INFO:
+            return self.info
+        if message_type == RESET:
+            observation = self.env.reset_envs(np.array([slot]))[0]
+            return observation.astype(np.float64).tobytes()
+        if message_type == STEP:
+            action = np.frombuffer(payload, dtype="<i8")
+            if action.size != self.action_size:
+                raise ValueError(f"Expected {self.action_size} action values")
+            # Checked here, a bad action in a batch would fail all of it
+            if ((action < 0) | (action >= self.num_actions)).any():
+                raise ValueError(
+                    f"Actions must be in [0, {self.num_actions}), got {action.tolist()}"
+                )
+            return await self.request_step(slot, action.reshape(self.action_shape))
+        raise ValueError(f"Unknown message type {message_type}")
+
+    def request_step(self, slot, action):
+        """
+        Description:
+            Queues a step of a sub-environment in the next batch
+
+        Parameters:
+            slot (int): The sub-environment
+            action (np.ndarray): Its action
+
+        Returns:
+            future (asyncio.Future): The reply payload of the step
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((slot, action, future))
+        if self.batch_task is None:
+            self.batch_task = asyncio.create_task(self.run_batch())
+        return future
+
+    async def run_batch(self):
+        """Step every queued sub-environment at once and answer them."""
+        # Let the other connections queue their requests first
+        await asyncio.sleep(self.batch_delay)
+        pending, self.pending = self.pending, []
+        self.batch_task = None
+
+        try:
+            replies = self.step_batch(pending)
+        except Exception:
+            # Step the requests one by one, only the ones that fail again
+            # get the error
+            replies = []
+            for request in pending:
+                try:
+                    replies.extend(self.step_batch([request]))
+                except Exception as error:
+                    replies.append(error)
+
+        for (_, _, future), reply in zip(pending, replies):
+            # The client may be gone, its future cancelled
+            if future.done():
+                continue
+            if isinstance(reply, Exception):
+                future.set_exception(reply)
+            else:
+                future.set_result(reply)
+
+    def step_batch(self, pending):
+        """
+        Description:
+            Steps the sub-environments of some queued requests at once
+
+        Parameters:
+            pending (list(tuple)): (slot, action, future) of each request
+
+        Returns:
+            replies (list(bytes)): The reply payload of each request
+        """
+        slots = np.array([slot for slot, _, _ in pending])
+        actions = np.array([action for _, action, _ in pending])
+        observation, reward, done = self.env.step(actions, slots)
+
+        self.batches += 1
+        self.batched_steps += len(slots)
+
+        observation = observation.reshape(len(slots), -1).astype("<f8")
+        reward = np.asarray(reward).reshape(len(slots), -1).astype("<f8")
+        done = np.asarray(done).astype(np.uint8)
+        return [
+            observation[i].tobytes() + reward[i].tobytes() + done[i].tobytes()
+            for i in range(len(slots))
+        ]
+
+    @staticmethod
+    def write_message(writer, message_type, status, payload):
+        """Write one framed message."""
+        writer.write(HEADER.pack(message_type, status, len(payload)) + payload)
+
+
+class EnvClient:
+    """
+    Description:
+        Blocking client of an EnvServer, for learners in other processes.
+        Owns one sub-environment of the server for as long as it is
+        connected.
+
+    Parameters:
+        address (str or tuple): Path of a Unix socket, or (host, port)
+    """
+
+    def __init__(self, address):
+        if isinstance(address, str):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # Requests are small, send them right away
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.connect(address)
+
+        info = self.request(INFO)
+        self.obs_size, self.action_size, self.reward_size, reward_scalar = (
+            INFO_PAYLOAD.unpack(info)
+        )
+        self.reward_scalar = bool(reward_scalar)
+        self._reward_end = 8 * (self.obs_size + self.reward_size)
+
+    def reset(self):
+        """
+        Description:
+            Resets the environment of this client
+
+        Returns:
+            state (np.ndarray): The new observation
+        """
+        return np.frombuffer(self.request(RESET), dtype="<f8")
+
+    def step(self, action):
+        """
+        Description:
+            Moves the environment of this client one step forward
+
+        Parameters:
+            action (int or sequence): The action
+
+        Returns:
+            state (np.ndarray): The new observation, the reset one if the
+                episode ended
+            reward (float or np.ndarray): The reward
+            done (bool): Whether the episode ended on this step
+        """
+        action = np.asarray(action, dtype="<i8").reshape(self.action_size)
+        reply = self.request(STEP, action.tobytes())
+
+        observation = np.frombuffer(reply, "<f8", self.obs_size)
+        reward = np.frombuffer(reply, "<f8", self.reward_size, 8 * self.obs_size)
+        if self.reward_scalar:
+            reward = float(reward[0])
+        return observation, reward, bool(reply[self._reward_end])
+
+    def request(self, message_type, payload=b""):
+        """
+        Description:
+            Sends one request and waits for its reply
+
+        Parameters:
+            message_type (int): INFO, RESET or STEP
+            payload (bytes): The request payload
+
+        Returns:
+            payload (bytes): The reply payload
+        """
+        self.sock.sendall(HEADER.pack(message_type, OK, len(payload)) + payload)
+        _, status, length = HEADER.unpack(self._recv_exactly(HEADER.size))
+        reply = self._recv_exactly(length)
+        if status != OK:
+            raise RuntimeError(reply.decode())
+        return reply
+
+    def close(self):
+        """Disconnects, freeing the environment on the server."""
+        self.sock.close()
+
+    def _recv_exactly(self, size):
+        """Receive exactly size bytes."""
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("The server closed the connection")
+            data += chunk
+        return bytes(data)
@@ -0,0 +1,41 @@
+def step_subset(env, actions, indices):
+    """
+    Description:
+        Steps some of the sub-environments of a vector environment: gathers
+        their rows of the env.STATE_ARRAYS, runs env.step on those rows only
+        and scatters the results back in place. Costs O(len(indices)), the
+        other rows are neither copied nor moved.
+
+        The state arrays are updated in place, so arrays returned by an
+        earlier step or reset of the whole batch may change.
+
+    Parameters:
+        env: Vector environment with num_envs, STATE_ARRAYS and a step that
+            steps num_envs sub-environments
+        actions (np.ndarray): (len(indices), *action_shape) array with their
+            actions
+        indices (np.ndarray): Indices of the sub-environments to step
+
+    Returns:
+        state, reward, done: What env.step returns, for the stepped rows
+    """
+    arrays = {}
+    for name in env.STATE_ARRAYS:
+        array = getattr(env, name)
+        # A full step can leave two names on one array, give each its own
+        # before writing their rows back
+        if any(array is other for other in arrays.values()):
+            array = array.copy()
+        arrays[name] = array
+
+    num_envs = env.num_envs
+    for name, array in arrays.items():
+        setattr(env, name, array[indices])
+    env.num_envs = len(indices)
+    try:
+        return env.step(actions)
+    finally:
+        for name, array in arrays.items():
+            array[indices] = getattr(env, name)
+            setattr(env, name, array)
+        env.num_envs = num_envs
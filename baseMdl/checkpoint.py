@@ -0,0 +1,151 @@
+import threading
+import time
+
+
+class Checkpointer:
+    """
+    Description:
+        Periodically saves a model while it trains. Every every_episodes
+        episodes or every_seconds seconds, whichever comes first, the q_table
+        is copied and the copy is written to a ModelStore on a background
+        thread, so training never waits for the disk. If a checkpoint is
+        still being written when the next one is taken, the newer one
+        replaces the one waiting.
+
+        close stops the writer thread once the last checkpoint is written
+        and ends the run, the next maybe_save starts the periods of a new
+        one and a later save starts a new writer thread.
+
+        The metadata of a checkpoint holds the episode to resume from, the
+        rewards so far and the state of the model and environment random
+        generators, see Mdl.load_checkpoint.
+
+    Parameters:
+        name (str): Name of the checkpoint in the store, overwritten by
+            every checkpoint, see ModelStore.save_checkpoint
+        store (ModelStore): Where to write the checkpoints
+        every_episodes (int): Episodes between checkpoints, None for no limit
+        every_seconds (float): Seconds between checkpoints, None for no limit
+    """
+
+    def __init__(self, name, store, every_episodes=None, every_seconds=None):
+        self.name = name
+        self.store = store
+        self.every_episodes = every_episodes
+        self.every_seconds = every_seconds
+        self.saved_checkpoints = 0
+
+        self._last_episode = None
+        self._last_time = None
+        self._pending = None
+        self._writing = False
+        self._closing = False
+        self._error = None
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def maybe_save(self, mdl, episode):
+        """
+        Description:
+            Takes a checkpoint if one is due. Call it after every episode
+
+        Parameters:
+            mdl (Mdl): The model being trained
+            episode (int): Number of episodes done, where training resumes
+
+        Returns:
+            saved (bool): True if a checkpoint was taken
+        """
+        now = time.monotonic()
+        if self._last_episode is None:
+            # First call of a run, the periods count from here
+            self._last_episode = episode
+            self._last_time = now
+
+        if (
+            self.every_episodes is not None
+            and episode - self._last_episode >= self.every_episodes
+        ) or (
+            self.every_seconds is not None
+            and now - self._last_time >= self.every_seconds
+        ):
+            self.save(mdl, episode)
+            return True
+        return False
+
+    def save(self, mdl, episode):
+        """
+        Description:
+            Takes a checkpoint now and queues it to be written
+
+        Parameters:
+            mdl (Mdl): The model being trained
+            episode (int): Number of episodes done, where training resumes
+        """
+        self._raise_writer_error()
+
+        # Snapshot on the training thread, it keeps changing the q_table
+        q_table = mdl.get_q_array(copy=True)
+        metadata = mdl.get_metadata()
+        metadata["checkpoint"] = mdl.get_training_state(episode)
+
+        self._last_episode = episode
+        self._last_time = time.monotonic()
+
+        with self._condition:
+            self._pending = (q_table, metadata)
+            self._condition.notify_all()
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_checkpoints, daemon=True)
+            self._thread.start()
+
+    def wait(self):
+        """Block until every checkpoint taken so far is written."""
+        with self._condition:
+            while self._pending is not None or self._writing:
+                self._condition.wait()
+        self._raise_writer_error()
+
+    def close(self):
+        """Write the pending checkpoint, if any, and stop the writer thread."""
+        # A reused Checkpointer counts the periods of its next run afresh
+        self._last_episode = None
+        self._last_time = None
+        if self._thread is not None:
+            with self._condition:
+                self._closing = True
+                self._condition.notify_all()
+            self._thread.join()
+            self._thread = None
+            self._closing = False
+        self._raise_writer_error()
+
+    def _write_checkpoints(self):
+        """Writer thread: write the latest pending checkpoint until closed."""
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closing:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                q_table, metadata = self._pending
+                self._pending = None
+                self._writing = True
+
+            try:
+                # One file renamed into place, table and metadata together
+                self.store.save_checkpoint(self.name, q_table, metadata)
+                self.saved_checkpoints += 1
+            except Exception as error:
+                self._error = error
+
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+    def _raise_writer_error(self):
+        """Re-raise an error of the writer thread in the caller's thread."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"Writing checkpoint {self.name} failed") from error
@@ -0,0 +1,75 @@
+import numpy as np
+
+
+class Discretizer:
+    """
+    Description:
+        Maps continuous observations to Q-table buckets.
+        Bounds, bucket counts and strides are computed once, so each call only
+        does the rounding and clamping. Accepts a single observation or a
+        (N, obs_dim) batch and returns bucket tuples or flat integer indices.
+
+    Parameters:
+        lower_bounds (list): Lower bound of each observation dimension
+        upper_bounds (list): Upper bound of each observation dimension
+        buckets (tuple): Number of buckets of each observation dimension
+    """
+
+    def __init__(self, lower_bounds, upper_bounds, buckets):
+        self.lower_bounds = lower_bounds
+        self.upper_bounds = upper_bounds
+        self.buckets = buckets
+
+        lower = np.asarray(lower_bounds, dtype=np.float64)
+        upper = np.asarray(upper_bounds, dtype=np.float64)
+        self._offset = np.abs(lower)
+        self._span = upper - lower
+        self._last = np.asarray(buckets, dtype=np.int64) - 1
+
+        # Row-major strides, a bucket tuple maps to sum(bucket * stride)
+        self.num_states = int(np.prod(buckets))
+        self.strides = np.ones(len(buckets), dtype=np.int64)
+        self.strides[:-1] = np.cumprod(buckets[:0:-1])[::-1]
+
+        # Plain Python copies for the single observation path
+        self._dims = tuple(
+            zip(self._offset.tolist(), self._span.tolist(), self._last.tolist())
+        )
+        self._strides = tuple(self.strides.tolist())
+
+        # Snapshot of the parameters, see is_for
+        self._key = (tuple(lower_bounds), tuple(upper_bounds), tuple(buckets))
+
+    def __call__(self, obs, flat=False):
+        """Discretize one observation or a (N, obs_dim) batch."""
+        if isinstance(obs, np.ndarray) and obs.ndim == 2:
+            return self.discretize_batch(obs, flat)
+        return self.discretize_one(obs, flat)
+
+    def discretize_one(self, obs, flat=False):
+        """Discretize a single observation.
+        Returns a bucket tuple, or its flat index when flat is True."""
+        new_obs = tuple(
+            [
+                min(last, max(0, int(round(last * ((ob + offset) / span)))))
+                for ob, (offset, span, last) in zip(obs, self._dims)
+            ]
+        )
+        if flat:
+            return sum(i * stride for i, stride in zip(new_obs, self._strides))
+        return new_obs
+
+    def discretize_batch(self, obs, flat=False):
+        """Discretize a (N, obs_dim) batch of observations.
+        Returns a tuple with one index array per dimension, ready to index
+        the Q-table, or a (N,) array of flat indices when flat is True."""
+        new_obs = np.rint(self._last * ((obs + self._offset) / self._span))
+        new_obs = np.clip(new_obs, 0, self._last).astype(np.int64)
+        if flat:
+            return new_obs @ self.strides
+        return tuple(new_obs.T)
+
+    def is_for(self, lower_bounds, upper_bounds, buckets):
+        """Whether this discretizer was built from these bounds and buckets.
+        Compares values, so bounds edited in place since are seen as new."""
+        return self._key == (tuple(lower_bounds), tuple(upper_bounds), tuple(buckets))
@@ -1,6 +1,11 @@
 import numpy as np
 import os
 
+from baseEnv.recorder import FrameRecorder, make_writer
+from baseMdl.discretizer import Discretizer
+from baseMdl.qtable import SparseQTable
+from baseMdl.store import ModelStore
+
 
 class Mdl:
     """
@@ -12,49 +17,363 @@ class Mdl:
         environment (Env): The environment of the model
     """
 
+    # Attributes saved in the metadata of a model, and restored on load
+    HYPERPARAMETERS = (
+        "episodes",
+        "alpha",
+        "gamma",
+        "epsilon",
+        "min_epsilon",
+        "max_epsilon",
+        "decay",
+    )
+
     def __init__(self, mdl_name, environment):
         # Name and Env
         self.mdlName = mdl_name
         self.env = environment
         # The model itself
         self.q_table = None
+        # Store the q_table as (num_states, num_actions) and address it with
+        # flat state indices instead of bucket tuples
+        self.flat_q_table = False
+        # Store only the visited states, in a SparseQTable
+        self.sparse_q_table = False
         # For discretizing
         self.upper_bounds = None
         self.lower_bounds = None
         self.buckets = None
+        self.discretizer = None
         # For training
         self.episodes = None
         self.alpha = None
         self.gamma = None
+        # Total reward of each training episode, and whether to print progress
+        self.rewards = None
+        self.verbose = True
         # For training exploration
         self.min_epsilon = None
         self.max_epsilon = None
         self.decay = None
+        # Random number generator of this model, see seed
+        self.np_random = np.random.default_rng()
         # For saving and loading models
         self.models_dir_name = "savedModels"
+        # Checkpointer called after every training episode, if set
+        self.checkpointer = None
+
+    def seed(self, seed=None):
+        """Seed the model and its environment with independent random
+        streams derived from seed, making training reproducible."""
+        mdl_seed, env_seed = np.random.SeedSequence(seed).spawn(2)
+        self.np_random = np.random.default_rng(mdl_seed)
+        self.env.np_random = np.random.default_rng(env_seed)
+
+    def get_discretizer(self, lower_bounds, upper_bounds, buckets):
+        """Return the Discretizer for the given bounds and buckets.
+        It is built once and reused for as long as the same bounds are passed."""
+        if self.discretizer is None or not self.discretizer.is_for(
+            lower_bounds, upper_bounds, buckets
+        ):
+            self.discretizer = Discretizer(lower_bounds, upper_bounds, buckets)
+        return self.discretizer
 
     def discretize(self, obs, lower_bounds, upper_bounds, buckets):
-        """Discretize the observation space into buckets."""
-        ratios = [
-            (ob + abs(lower_bounds[i])) / (upper_bounds[i] - lower_bounds[i])
-            for i, ob in enumerate(obs)
-        ]
-        new_obs = [int(round((buckets[i] - 1) * ratios[i])) for i in range(len(obs))]
-        new_obs = [min(buckets[i] - 1, max(0, new_obs[i])) for i in range(len(obs))]
-        return tuple(new_obs)
-
-    def train_from_scratch(self):
+        """Discretize the observation space into buckets.
+        Returns a bucket tuple, or a flat state index if flat_q_table is set."""
+        discretizer = self.get_discretizer(lower_bounds, upper_bounds, buckets)
+        return discretizer.discretize_one(obs, self.flat_q_table)
+
+    def discretize_batch(self, obs, lower_bounds, upper_bounds, buckets):
+        """Discretize a (N, obs_dim) batch of observations into buckets.
+        Returns a tuple with one index array per dimension, or an array of
+        flat state indices if flat_q_table is set, ready to index the q_table."""
+        discretizer = self.get_discretizer(lower_bounds, upper_bounds, buckets)
+        return discretizer.discretize_batch(obs, self.flat_q_table)
+
+    def new_q_table(self, num_actions):
+        """Return a zeroed q_table in the layout selected by flat_q_table,
+        a SparseQTable if sparse_q_table is set."""
+        if self.sparse_q_table:
+            return SparseQTable(self.buckets, num_actions, self.flat_q_table)
+        if self.flat_q_table:
+            return np.zeros((int(np.prod(self.buckets)), num_actions))
+        return np.zeros(self.buckets + (num_actions,))
+
+    def q_index(self, states, actions):
+        """Index of the (state, action) entries of the q_table."""
+        if self.flat_q_table:
+            return (states, actions)
+        return states + (actions,)
+
+    def greedy_actions(self, observations):
+        """
+        Description:
+            Returns the greedy action of the q_table for a batch of
+            observations
+
+        Parameters:
+            observations (np.ndarray): (N, obs_dim) array of observations
+
+        Returns:
+            actions (np.ndarray): (N,) array of actions
+        """
+        states = self.discretize_batch(
+            observations, self.lower_bounds, self.upper_bounds, self.buckets
+        )
+        if isinstance(self.q_table, SparseQTable):
+            # Look the visited states up one by one, unseen ones are default
+            if self.flat_q_table:
+                keys = states.tolist()
+            else:
+                keys = zip(*(index.tolist() for index in states))
+            q_values = np.array([self.q_table.get(key) for key in keys])
+        else:
+            q_values = self.q_table[states]
+        return np.asarray(self.env.action_space)[np.argmax(q_values, axis=1)]
+
+    def get_epsilon(self, episode):
+        """Exploration rate of a training episode, or of an array of
+        episodes, decaying exponentially from max_epsilon to min_epsilon."""
+        return self.min_epsilon + (self.max_epsilon - self.min_epsilon) * np.exp(
+            -self.decay * episode
+        )
+
+    def train_from_scratch(self, resume_from=None):
+        """
+        Description:
+            Train new model with a brand new q_table, one run_episode per
+            episode. If a checkpointer is set, the model is checkpointed
+            while it trains
+
+        Parameters:
+            resume_from (str): Name of a checkpoint to resume training from
+                instead of starting over, looked up in the store of the
+                checkpointer if set, see load_checkpoint
+        """
+        if resume_from is None:
+            self.q_table = self.new_q_table(len(self.env.action_space))
+            self.rewards = np.zeros(self.episodes)
+            start_episode = 0
+        else:
+            store = self.checkpointer.store if self.checkpointer else None
+            start_episode = self.load_checkpoint(resume_from, store)
+
+        if self.verbose:
+            print(f"Training model from scratch for {self.episodes - 1} episodes...")
+        try:
+            if self.checkpointer is not None:
+                self.checkpointer.maybe_save(self, start_episode)
+            for episode in range(start_episode, self.episodes):
+                epsilon = self.get_epsilon(episode)
+
+                total_reward = self.run_episode(epsilon)
+
+                self.rewards[episode] = total_reward
+
+                if self.checkpointer is not None:
+                    self.checkpointer.maybe_save(self, episode + 1)
+
+                if self.verbose and not episode % 100:
+                    print(
+                        f"Episode: {episode} | Reward: {total_reward} "
+                        f"| Epsilon: {epsilon}"
+                    )
+
+            # The last checkpoint holds the trained model
+            if self.checkpointer is not None:
+                self.checkpointer.save(self, self.episodes)
+                self.checkpointer.wait()
+        finally:
+            if self.checkpointer is not None:
+                self.checkpointer.close()
+
+    def run_episode(self, epsilon):
+        """
+        Description:
+            Runs one training episode, updating the q_table after every
+            step. Implemented by the subclasses
+
+        Parameters:
+            epsilon (float): Probability of taking a random action
+
+        Returns:
+            total_reward (float): The reward of the episode
+        """
         pass
 
+    def greedy_action(self, observation):
+        """
+        Description:
+            Returns the best action of the q_table for one observation.
+            Implemented by the subclasses
+
+        Parameters:
+            observation: Observation of the environment
+
+        Returns:
+            action (int): The action
+        """
+        pass
+
+    def get_q_array(self, copy=False):
+        """
+        Description:
+            Returns the q_table as an array to save: in bucket layout for a
+            dense q_table, packed with SparseQTable.to_array for a sparse one
+
+        Parameters:
+            copy (bool): Never return a view of the q_table
+
+        Returns:
+            q_array (np.ndarray): The q_table as an array
+        """
+        if isinstance(self.q_table, SparseQTable):
+            return self.q_table.to_array()
+        q_array = self.q_table.reshape(self.buckets + (-1,))
+        return q_array.copy() if copy else q_array
+
+    def get_store(self):
+        """Return the ModelStore of the savedModels directory."""
+        models_dir = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            self.models_dir_name,
+        )
+        return ModelStore(models_dir)
+
+    def get_metadata(self):
+        """
+        Description:
+            Returns what is needed to use the q_table again: env and model
+            names, discretization and the hyperparameters it was trained with
+
+        Returns:
+            metadata (dict): JSON serializable metadata
+        """
+        return {
+            "mdl_class": type(self).__name__,
+            "mdl_name": self.mdlName,
+            "env_name": getattr(self.env, "envName", None),
+            "lower_bounds": list(self.lower_bounds),
+            "upper_bounds": list(self.upper_bounds),
+            "buckets": list(self.buckets),
+            "q_table_backend": (
+                "sparse" if isinstance(self.q_table, SparseQTable) else "dense"
+            ),
+            "hyperparameters": {
+                name: getattr(self, name)
+                for name in self.HYPERPARAMETERS
+                if getattr(self, name, None) is not None
+            },
+        }
+
+    def save_model(self, name, store=None):
+        """
+        Description:
+            Saves the q_table and its metadata, a dense q_table always in
+            bucket layout
+
+        Parameters:
+            name (str): Name of the model
+            store (ModelStore): Where to save it, savedModels if None
+        """
+        store = store or self.get_store()
+        store.save(name, self.get_q_array(), self.get_metadata())
+
+    def load_model(self, name, mmap_mode="r", store=None):
+        """
+        Description:
+            Loads a q_table saved with save_model, and the discretization and
+            hyperparameters of its metadata. The default mmap_mode maps the
+            table read-only, enough to watch or evaluate the model; pass
+            mmap_mode=None for a table that can be trained further. A sparse
+            table is always unpacked into memory
+
+        Parameters:
+            name (str): Name of the model
+            mmap_mode (str): np.load mmap_mode, see ModelStore.load
+            store (ModelStore): Where to load it from, savedModels if None
+        """
+        store = store or self.get_store()
+        self.set_model(*store.load(name, mmap_mode))
+
+    def set_model(self, q_table, metadata):
+        """
+        Description:
+            Sets a loaded q_table, and the discretization and hyperparameters
+            of its metadata
+
+        Parameters:
+            q_table (np.ndarray): The q_table as saved, in bucket layout
+            metadata (dict): Its metadata, see get_metadata
+        """
+        if "buckets" in metadata:
+            self.buckets = tuple(metadata["buckets"])
+            self.lower_bounds = metadata["lower_bounds"]
+            self.upper_bounds = metadata["upper_bounds"]
+        for hyperparameter, value in metadata.get("hyperparameters", {}).items():
+            setattr(self, hyperparameter, value)
+
+        self.sparse_q_table = metadata.get("q_table_backend") == "sparse"
+        if self.sparse_q_table:
+            q_table = SparseQTable.from_array(q_table, self.buckets, self.flat_q_table)
+        elif self.flat_q_table:
+            # Reshaping the contiguous table is a view, it stays memory-mapped
+            q_table = q_table.reshape(-1, q_table.shape[-1])
+        self.q_table = q_table
+
+    def get_training_state(self, episode):
+        """
+        Description:
+            Returns what a checkpoint needs, besides the q_table, to resume
+            training after episode: the rewards so far and the states of the
+            model and environment random generators. The epsilon schedule
+            only depends on the episode
+
+        Parameters:
+            episode (int): Number of episodes done
+
+        Returns:
+            state (dict): JSON serializable training state
+        """
+        return {
+            "episode": episode,
+            "rewards": self.rewards[:episode].tolist(),
+            "mdl_rng": self.np_random.bit_generator.state,
+            "env_rng": self.env.np_random.bit_generator.state,
+        }
+
+    def load_checkpoint(self, name, store=None):
+        """
+        Description:
+            Loads a checkpoint written by a Checkpointer: the q_table, its
+            metadata and the training state, so training continues exactly
+            where the checkpoint was taken
+
+        Parameters:
+            name (str): Name of the checkpoint
+            store (ModelStore): Where to load it from, savedModels if None
+
+        Returns:
+            episode (int): The episode to resume training from
+        """
+        store = store or self.get_store()
+        # Read into memory, training writes to the table
+        q_table, metadata = store.load_checkpoint(name)
+        self.set_model(q_table, metadata)
+        state = metadata["checkpoint"]
+
+        self.rewards = np.zeros(self.episodes)
+        self.rewards[: state["episode"]] = state["rewards"]
+        self.np_random.bit_generator.state = state["mdl_rng"]
+        self.env.np_random.bit_generator.state = state["env_rng"]
+        return state["episode"]
+
     def import_model(self):
         while True:
             mdl_file = input("Enter model file name (.npy): ")
-             # Gets the path to the savedModels directory
-            models_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), self.models_dir_name)
-            # Gets the path to the saved model file
-            mdl_file = os.path.join(models_dir, mdl_file)
             try:
-                self.q_table = np.load(mdl_file, allow_pickle=False)
+                self.load_model(mdl_file)
                 return
             except OSError:
                 print(f"The input file {mdl_file} doesn't exist " f"or cannot be read.")
@@ -69,8 +388,81 @@ class Mdl:
                     f"Can't read an empty file."
                 )
 
-    def watch_trained_model(self):
-        pass
+    def watch_trained_model(self, recorder=None):
+        """
+        Description:
+            Watch model in its environment. With a recorder, the episode is
+            rendered offscreen and streamed to the recorder instead of shown
+            in real time on the window
+
+        Parameters:
+            recorder (FrameRecorder): Recorder of the rendered frames
+
+        Returns:
+            total_reward (float): The reward of the episode
+        """
+        observation = self.env.reset()
+        total_reward = 0
+
+        if self.verbose:
+            print("Watching trained model...")
+        while self.env.running:
+            if recorder is None:
+                self.env.render()
+            else:
+                recorder.record(self.env.render("rgb_array"))
+
+            action = self.greedy_action(observation)
+
+            observation, reward, done = self.env.step(action)
+
+            total_reward += reward
+
+            if done:
+                self.env.running = False
+                if self.verbose:
+                    print(f"Total Reward: {total_reward}")
+        if self.verbose:
+            print("Finished watching trained model...")
+        return total_reward
+
+    def record_trained_model(self, path, episodes=1, queue_size=64, block=False):
+        """
+        Description:
+            Records episodes of the model without opening a window, one
+            video or image directory per episode. By default the episode
+            never waits for the writer: frames that find no free buffer are
+            dropped and counted
+
+        Parameters:
+            path (str): Video file (.mp4, .mkv, ...) or image directory,
+                formatted with the episode number, e.g. "videos/episode_{}.mp4"
+            episodes (int): The number of episodes to record
+            queue_size (int): Number of frames buffered for the writer
+            block (bool): Wait for the writer instead of dropping frames,
+                slows the episodes down to the speed of the writer
+
+        Returns:
+            total_rewards (list(float)): The reward of each episode
+            dropped_frames (list(int)): The frames dropped in each episode
+        """
+        fps = self.env.pacer.realtime_fps or 30
+        total_rewards = []
+        dropped_frames = []
+        for episode in range(episodes):
+            writer = make_writer(path.format(episode), fps)
+            recorder = FrameRecorder(writer, queue_size, block)
+            try:
+                total_rewards.append(self.watch_trained_model(recorder))
+            finally:
+                recorder.close()
+            dropped_frames.append(recorder.dropped_frames)
+            if self.verbose and recorder.dropped_frames:
+                print(
+                    f"Episode {episode}: dropped {recorder.dropped_frames} "
+                    f"frames, the writer fell behind"
+                )
+        return total_rewards, dropped_frames
 
     def ask_to_save_model(self):
         while True:
@@ -79,13 +471,7 @@ class Mdl:
                 return
             elif save in ("Y", "y"):
                 mdl_file = input("Enter model file name: ")
-                # Gets the path to the savedModels directory
-                models_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), self.models_dir_name)
-                if not os.path.exists(models_dir):
-                    os.makedirs(models_dir)
-                # Gets the path to the saved model file
-                mdl_file = os.path.join(models_dir, mdl_file)
-                np.save(mdl_file, self.q_table)
+                self.save_model(mdl_file)
                 return
 
             print("Please enter 'y' or 'n'.\n" "Or press ENTER for default 'n'.")
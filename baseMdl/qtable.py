@@ -0,0 +1,116 @@
+import numpy as np
+
+
+class SparseQTable:
+    """
+    Description:
+        Q-table that only stores the states that were visited, in a dict of
+        state -> action values. Memory grows with the number of visited
+        states instead of the size of the bucket grid, for grids too fine to
+        allocate densely.
+
+        Indexing works like a row of the dense q_table: q_table[state] returns
+        the action values of state as a NumPy array that can be updated in
+        place, adding a row of default values the first time a state is seen.
+        get reads a state without adding it.
+
+    Parameters:
+        buckets (tuple): Number of buckets of each observation dimension
+        num_actions (int): Number of actions
+        flat (bool): States are flat indices instead of bucket tuples, see
+            Mdl.flat_q_table
+        default (float): Value of the actions of a state never updated
+    """
+
+    def __init__(self, buckets, num_actions, flat=False, default=0.0):
+        self.buckets = tuple(buckets)
+        self.num_actions = num_actions
+        self.flat = flat
+        self.default = default
+        self.rows = {}
+
+        # Returned by get for unseen states, read-only so it stays default
+        self._default_row = np.full(num_actions, default)
+        self._default_row.flags.writeable = False
+
+    def __getitem__(self, state):
+        row = self.rows.get(state)
+        if row is None:
+            row = np.full(self.num_actions, self.default)
+            self.rows[state] = row
+        return row
+
+    def __contains__(self, state):
+        return state in self.rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, state):
+        """
+        Description:
+            Returns the action values of a state without storing it
+
+        Parameters:
+            state (tuple or int): Bucket tuple, or flat index if flat
+
+        Returns:
+            q_values (np.ndarray): The action values, read-only for a state
+                never updated
+        """
+        return self.rows.get(state, self._default_row)
+
+    def get_dtype(self):
+        """Return the structured dtype of the rows of to_array."""
+        return np.dtype(
+            [
+                ("state", np.int64, (len(self.buckets),)),
+                ("q_values", np.float64, (self.num_actions,)),
+            ]
+        )
+
+    def to_array(self):
+        """
+        Description:
+            Packs the visited states into one structured array, to be saved
+            with np.save. Each row holds the bucket indices of a state as
+            int64, so states of grids with more than 2**53 cells round-trip
+            exactly, and its action values
+
+        Returns:
+            table (np.ndarray): (num_visited,) array of get_dtype
+        """
+        table = np.empty(len(self.rows), self.get_dtype())
+        if self.rows:
+            states = list(self.rows)
+            if self.flat:
+                states = np.stack(np.unravel_index(states, self.buckets), axis=1)
+            table["state"] = states
+            table["q_values"] = np.stack(list(self.rows.values()))
+        return table
+
+    @classmethod
+    def from_array(cls, table, buckets, flat=False, default=0.0):
+        """
+        Description:
+            Unpacks an array made by to_array
+
+        Parameters:
+            table (np.ndarray): Array made by to_array
+            buckets (tuple): Number of buckets of each observation dimension
+            flat (bool): Key the states by flat index instead of bucket tuple
+            default (float): Value of the actions of a state never updated
+
+        Returns:
+            q_table (SparseQTable): The Q-table
+        """
+        states = table["state"]
+        q_values = table["q_values"]
+
+        q_table = cls(buckets, q_values.shape[1], flat, default)
+        if flat:
+            keys = np.ravel_multi_index(states.T, buckets).tolist()
+        else:
+            keys = map(tuple, states.tolist())
+        q_table.rows = dict(zip(keys, np.array(q_values)))
+        return q_table
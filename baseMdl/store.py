@@ -0,0 +1,178 @@
+import json
+import numpy as np
+import os
+
+
+class ModelStore:
+    """
+    Description:
+        Directory of saved models. Each model is a Q-table saved as
+        <name>.npy next to a <name>.json file with its metadata (buckets,
+        bounds, hyperparameters, env name, ...). Tables are loaded with
+        np.load's mmap_mode, so a large table opens without being read and
+        the processes that load it read-only share the same pages of memory.
+
+        Checkpoints are written as a single <name>.npz holding the Q-table
+        and its metadata, renamed into place in one step, so a crash never
+        pairs a new table with stale metadata. load and load_metadata fall
+        back to the checkpoint of a name that has no saved model.
+
+    Parameters:
+        directory (str): Directory of the models, created on the first save
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def get_paths(self, name):
+        """
+        Description:
+            Returns the table and metadata files of a model
+
+        Parameters:
+            name (str): Name of the model, with or without .npy
+
+        Returns:
+            table_path (str): Path of the .npy file
+            metadata_path (str): Path of the .json file
+        """
+        if name.endswith(".npy"):
+            name = name[: -len(".npy")]
+        path = os.path.join(self.directory, name)
+        return path + ".npy", path + ".json"
+
+    def get_checkpoint_path(self, name):
+        """Return the path of the .npz file of a checkpoint."""
+        if name.endswith(".npz"):
+            name = name[: -len(".npz")]
+        return os.path.join(self.directory, name + ".npz")
+
+    def save(self, name, q_table, metadata=None):
+        """
+        Description:
+            Saves a Q-table and its metadata. Both files are written under a
+            temporary name and renamed, so a reader never sees half a model
+
+        Parameters:
+            name (str): Name of the model
+            q_table (np.ndarray): The Q-table
+            metadata (dict): JSON serializable metadata, NumPy scalars and
+                arrays are converted
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        table_path, metadata_path = self.get_paths(name)
+
+        # np.save would append .npy to a temporary name without it
+        tmp_table_path = table_path + ".tmp.npy"
+        np.save(tmp_table_path, q_table)
+        os.replace(tmp_table_path, table_path)
+
+        tmp_metadata_path = metadata_path + ".tmp"
+        with open(tmp_metadata_path, "w") as f:
+            json.dump(metadata or {}, f, indent=2, default=to_json)
+        os.replace(tmp_metadata_path, metadata_path)
+
+    def save_checkpoint(self, name, q_table, metadata=None):
+        """
+        Description:
+            Saves a Q-table and its metadata as one checkpoint file, written
+            under a temporary name and renamed, so the table and metadata of
+            a checkpoint always come from the same save
+
+        Parameters:
+            name (str): Name of the checkpoint
+            q_table (np.ndarray): The Q-table
+            metadata (dict): JSON serializable metadata, NumPy scalars and
+                arrays are converted
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        checkpoint_path = self.get_checkpoint_path(name)
+
+        tmp_checkpoint_path = checkpoint_path + ".tmp"
+        # Through a file object, np.savez would append .npz to the name
+        with open(tmp_checkpoint_path, "wb") as f:
+            np.savez(
+                f,
+                q_table=q_table,
+                metadata=np.array(json.dumps(metadata or {}, default=to_json)),
+            )
+        os.replace(tmp_checkpoint_path, checkpoint_path)
+
+    def load_checkpoint(self, name):
+        """
+        Description:
+            Loads a checkpoint written by save_checkpoint, read into memory
+
+        Parameters:
+            name (str): Name of the checkpoint
+
+        Returns:
+            q_table (np.ndarray): The Q-table
+            metadata (dict): The metadata
+        """
+        with np.load(self.get_checkpoint_path(name), allow_pickle=False) as archive:
+            return archive["q_table"], json.loads(str(archive["metadata"]))
+
+    def load(self, name, mmap_mode="r"):
+        """
+        Description:
+            Loads a Q-table and its metadata
+
+        Parameters:
+            name (str): Name of the model
+            mmap_mode (str): np.load mmap_mode. "r" maps the table read-only,
+                "c" copy-on-write, None reads it whole into memory
+
+        Returns:
+            q_table (np.ndarray): The Q-table, a np.memmap unless mmap_mode
+                is None or it is read from a checkpoint
+            metadata (dict): The metadata, empty if the model has none, like
+                models saved before the store existed
+        """
+        table_path, metadata_path = self.get_paths(name)
+        if not os.path.exists(table_path) and self.is_checkpoint(name):
+            return self.load_checkpoint(name)
+        q_table = np.load(table_path, mmap_mode=mmap_mode, allow_pickle=False)
+
+        metadata = {}
+        if os.path.exists(metadata_path):
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+        return q_table, metadata
+
+    def load_metadata(self, name):
+        """Return the metadata of a model without opening its table."""
+        table_path, metadata_path = self.get_paths(name)
+        if not os.path.exists(table_path) and self.is_checkpoint(name):
+            with np.load(self.get_checkpoint_path(name), allow_pickle=False) as archive:
+                return json.loads(str(archive["metadata"]))
+        if not os.path.exists(metadata_path):
+            return {}
+        with open(metadata_path) as f:
+            return json.load(f)
+
+    def is_checkpoint(self, name):
+        """Return whether the store holds a checkpoint of that name."""
+        return os.path.exists(self.get_checkpoint_path(name))
+
+    def list_models(self):
+        """Return the names of the models and checkpoints in the store, sorted."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            {
+                os.path.splitext(file_name)[0]
+                for file_name in os.listdir(self.directory)
+                if file_name.endswith((".npy", ".npz"))
+                and not file_name.endswith(".tmp.npy")
+            }
+        )
+
+
+def to_json(value):
+    """json.dump default for NumPy values."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
@@ -0,0 +1,133 @@
+import numpy as np
+
+from baseMdl.mdl import Mdl
+from baseMdl.tilecoder import TileCoder
+
+
+class TileCodingMdl(Mdl):
+    """
+    Description:
+        Linear Q-learning model over tile-coded features. Instead of one
+        bucket grid, observations are encoded by num_tilings offset tilings
+        with buckets tiles per dimension, and Q(s, a) is the sum of the
+        weights of the num_tilings active tiles. Updating those weights moves
+        the value of every nearby observation, so the model generalizes
+        without a finer, combinatorially larger table.
+
+        The q_table holds the (num_features, num_actions) weights. A step
+        costs a few small array operations: one to find the active tiles, a
+        gather and sum for the action values, and an in-place update of the
+        num_tilings weights of the chosen action.
+
+        Works with any environment whose step(action) returns
+        (observation, reward, done) and that sets running on reset.
+
+    Parameters:
+        mdl_name (str): name of the model
+        environment (Env): environment with which it interacts
+    """
+
+    HYPERPARAMETERS = Mdl.HYPERPARAMETERS + ("num_tilings",)
+
+    def __init__(self, mdl_name, environment):
+        """
+        Description:
+            Initializes the model
+        Parameters:
+            mdl_name (str): name of the model
+            environment (Env): environment with which it interacts
+        """
+        super().__init__(mdl_name, environment)
+        # buckets is the number of tiles of each dimension, per tiling
+        self.num_tilings = 8
+        self.tile_coder = None
+
+    def get_tile_coder(self):
+        """Return the TileCoder of the current bounds, tiles and tilings.
+        It is built once and reused for as long as they don't change."""
+        if self.tile_coder is None or not self.tile_coder.is_for(
+            self.lower_bounds, self.upper_bounds, self.buckets, self.num_tilings
+        ):
+            self.tile_coder = TileCoder(
+                self.lower_bounds, self.upper_bounds, self.buckets, self.num_tilings
+            )
+        return self.tile_coder
+
+    def new_q_table(self, num_actions):
+        """Return zeroed weights for the features of the tile coder."""
+        return np.zeros((self.get_tile_coder().num_features, num_actions))
+
+    def get_q_array(self, copy=False):
+        """Return the weights, they are saved as they are."""
+        return self.q_table.copy() if copy else self.q_table
+
+    def q_values(self, features):
+        """Action values of the observation with the given active features."""
+        return self.q_table[features].sum(axis=0)
+
+    def greedy_actions(self, observations):
+        """
+        Description:
+            Returns the greedy action for a batch of observations
+
+        Parameters:
+            observations (np.ndarray): (N, obs_dim) array of observations
+
+        Returns:
+            actions (np.ndarray): (N,) array of actions
+        """
+        features = self.get_tile_coder()(observations)
+        q_values = self.q_table[features].sum(axis=1)
+        return np.asarray(self.env.action_space)[np.argmax(q_values, axis=1)]
+
+    def greedy_action(self, observation):
+        """Return the action with the highest value for one observation."""
+        return np.argmax(self.q_values(self.get_tile_coder()(observation)))
+
+    def run_episode(self, epsilon):
+        """
+        Description:
+            Runs one training episode, updating the weights of the active
+            tiles after every step
+
+        Parameters:
+            epsilon (float): Probability of taking a random action
+
+        Returns:
+            total_reward (float): The reward of the episode
+        """
+        tile_coder = self.get_tile_coder()
+        # Spread each update over the active tiles
+        step_size = self.alpha / self.num_tilings
+
+        features = tile_coder(self.env.reset())
+
+        total_reward = 0
+
+        while self.env.running:
+            q_values = self.q_values(features)
+
+            if self.np_random.random() > epsilon:
+                action = np.argmax(q_values)
+            else:
+                action = self.env.action_space[
+                    int(self.np_random.random() * len(self.env.action_space))
+                ]
+
+            observation, reward, done = self.env.step(action)
+
+            new_features = tile_coder(observation)
+            new_q_values = self.q_values(new_features)
+
+            total_reward += reward
+
+            # The tiles of one observation are distinct, += is safe
+            target = reward if done else reward + self.gamma * np.max(new_q_values)
+            self.q_table[features, action] += step_size * (target - q_values[action])
+
+            features = new_features
+
+            if done:
+                self.env.running = False
+
+        return total_reward
@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class TileCoder:
+    """
+    Description:
+        Maps continuous observations to the active features of several
+        offset tilings. Each tiling is a grid over the observation bounds,
+        shifted by a fraction of a tile, so nearby observations share most of
+        their tiles and a coarse grid per tiling still gives a fine overall
+        resolution. Offsets follow the asymmetric displacements (1, 3, 5, ...)
+        of Sutton and Barto, which avoid tilings lining up on the diagonals.
+
+        An observation activates exactly one tile per tiling, returned as
+        num_tilings feature indices in [0, num_features).
+
+    Parameters:
+        lower_bounds (list): Lower bound of each observation dimension
+        upper_bounds (list): Upper bound of each observation dimension
+        tiles (tuple): Number of tiles of each observation dimension, per
+            tiling
+        num_tilings (int): Number of tilings
+    """
+
+    def __init__(self, lower_bounds, upper_bounds, tiles, num_tilings):
+        self.lower_bounds = lower_bounds
+        self.upper_bounds = upper_bounds
+        self.tiles = tiles
+        self.num_tilings = num_tilings
+
+        self._lower = np.asarray(lower_bounds, dtype=np.float64)
+        self._upper = np.asarray(upper_bounds, dtype=np.float64)
+        self._scale = np.asarray(tiles, dtype=np.float64) / (self._upper - self._lower)
+
+        # (num_tilings, obs_dim) offset of each tiling, in tiles
+        displacement = 2 * np.arange(len(tiles)) + 1
+        self._offsets = (
+            np.arange(num_tilings)[:, None] * displacement / num_tilings
+        ) % 1.0
+
+        # The offsets shift the grid, one extra tile per dimension covers it
+        dims = np.asarray(tiles, dtype=np.int64) + 1
+        self._strides = np.ones(len(tiles), dtype=np.int64)
+        self._strides[:-1] = np.cumprod(dims[:0:-1])[::-1]
+        tiles_per_tiling = int(np.prod(dims))
+        self._tiling_start = np.arange(num_tilings) * tiles_per_tiling
+        self.num_features = num_tilings * tiles_per_tiling
+
+        # Snapshot of the parameters, see is_for
+        self._key = (
+            tuple(lower_bounds),
+            tuple(upper_bounds),
+            tuple(tiles),
+            num_tilings,
+        )
+
+    def __call__(self, obs):
+        """
+        Description:
+            Returns the active features of one observation or a batch
+
+        Parameters:
+            obs (np.ndarray): (obs_dim,) observation or (N, obs_dim) batch
+
+        Returns:
+            features (np.ndarray): (num_tilings,) or (N, num_tilings) int
+                array of feature indices
+        """
+        obs = np.clip(obs, self._lower, self._upper)
+        scaled = (obs - self._lower) * self._scale
+        # Broadcast every observation against every tiling offset
+        coords = np.floor(scaled[..., None, :] + self._offsets).astype(np.int64)
+        return coords @ self._strides + self._tiling_start
+
+    def is_for(self, lower_bounds, upper_bounds, tiles, num_tilings):
+        """Whether this tile coder was built from these bounds and tiles.
+        Compares values, so bounds edited in place since are seen as new."""
+        return self._key == (
+            tuple(lower_bounds),
+            tuple(upper_bounds),
+            tuple(tiles),
+            num_tilings,
+        )
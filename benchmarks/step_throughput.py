@@ -0,0 +1,328 @@
+import argparse
+import datetime
+import functools
+import json
+import numpy as np
+import platform
+import pygame
+import time
+import os
+import sys
+
+# Get the current script's directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the absolute path to the project's root directory
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+# Add the project's root directory to sys.path
+sys.path.append(project_root)
+
+from baseMdl.mdl import Mdl  # noqa: E402
+from baseEnv.pacer import FramePacer  # noqa: E402
+from baseEnv.pool import SubprocEnvPool  # noqa: E402
+from cartPole.cartpole import CartpoleEnv  # noqa: E402
+from cartPole.vector_cartpole import VectorCartpoleEnv  # noqa: E402
+from game.captureTheFlag import CaptureTheFlagEnv  # noqa: E402
+from game.football import FootballEnv  # noqa: E402
+from game.vector_football import VectorFootballEnv  # noqa: E402
+
+CARTPOLE_LOWER_BOUNDS = [-4.8, -3.4, -0.42, -3.4]
+CARTPOLE_UPPER_BOUNDS = [4.8, 3.4, 0.42, 3.4]
+CARTPOLE_BUCKETS = (1, 1, 6, 5)
+
+
+def measure(call, calls, steps_per_call=1):
+    """
+    Description:
+        Times a benchmark callable
+
+    Parameters:
+        call (callable): Runs one unit of work and returns the number of
+            episodes that finished during it
+        calls (int): How many times to run call
+        steps_per_call (int): Environment steps done by each call
+
+    Returns:
+        result (dict): Throughput and per-call latency percentiles
+    """
+    latencies = np.empty(calls)
+    episodes = 0
+
+    start = time.perf_counter()
+    for i in range(calls):
+        call_start = time.perf_counter_ns()
+        episodes += call()
+        latencies[i] = time.perf_counter_ns() - call_start
+    elapsed = time.perf_counter() - start
+
+    latencies /= 1000
+    return {
+        "calls": calls,
+        "seconds": elapsed,
+        "steps_per_sec": calls * steps_per_call / elapsed,
+        "episodes_per_sec": episodes / elapsed,
+        "latency_us": {
+            "mean": float(latencies.mean()),
+            "p50": float(np.percentile(latencies, 50)),
+            "p90": float(np.percentile(latencies, 90)),
+            "p99": float(np.percentile(latencies, 99)),
+            "max": float(latencies.max()),
+        },
+    }
+
+
+def bench_cartpole_step(calls):
+    """CartpoleEnv.step with random actions, never initializes pygame."""
+    env = CartpoleEnv("Cartpole")
+    env.reset(pygame.HIDDEN, seed=0)
+    actions = env.np_random.integers(2, size=calls).tolist()
+    actions.reverse()
+
+    def call():
+        _, _, done = env.step(actions.pop())
+        if done:
+            env.reset(pygame.HIDDEN)
+        return done
+
+    return measure(call, calls)
+
+
+def bench_vector_cartpole_step(calls, num_envs):
+    """VectorCartpoleEnv.step with random actions for num_envs cartpoles."""
+    env = VectorCartpoleEnv("Cartpole", num_envs)
+    env.reset(pygame.HIDDEN, seed=0)
+    actions = env.np_random.integers(2, size=(calls, num_envs))
+    steps = iter(actions)
+
+    def call():
+        _, _, done = env.step(next(steps))
+        return int(done.sum())
+
+    return measure(call, calls, num_envs)
+
+
+def bench_pool_cartpole_step(calls, num_envs):
+    """SubprocEnvPool.step of num_envs CartpoleEnv, one worker per core."""
+    pool = SubprocEnvPool(functools.partial(CartpoleEnv, "Cartpole"), num_envs)
+    pool.reset(seed=0)
+    actions = np.random.default_rng(0).integers(2, size=(calls, num_envs))
+    steps = iter(actions)
+
+    def call():
+        _, _, dones = pool.step(next(steps))
+        return int(dones.sum())
+
+    try:
+        return measure(call, calls, num_envs)
+    finally:
+        pool.close()
+
+
+def bench_cartpole_render(calls):
+    """CartpoleEnv.render on a hidden window, with pacing at max speed."""
+    env = CartpoleEnv("Cartpole")
+    env.reset(pygame.HIDDEN, seed=0)
+    env.pacer.set_mode(FramePacer.MAX_SPEED)
+
+    def call():
+        env.render()
+        return 0
+
+    return measure(call, calls)
+
+
+def bench_cartpole_draw(calls):
+    """CartpoleEnv.draw plus a display flip on a hidden window."""
+    env = CartpoleEnv("Cartpole")
+    env.reset(pygame.HIDDEN, seed=0)
+    display = env.get_display()
+
+    def call():
+        env.draw(display, env.state)
+        pygame.display.flip()
+        return 0
+
+    return measure(call, calls)
+
+
+def measure_two_player_steps(env, calls, render=False):
+    """
+    Description:
+        Times step of a two player env with random actions, resetting it
+        when a match ends
+
+    Parameters:
+        env (Env): FootballEnv or CaptureTheFlagEnv
+        calls (int): Number of steps
+        render (bool): Also render every step on a hidden window, with
+            pacing at max speed
+
+    Returns:
+        result (dict): See measure
+    """
+    env.reset(pygame.HIDDEN, seed=0)
+    env.pacer.set_mode(FramePacer.MAX_SPEED)
+    actions = env.np_random.integers(len(env.action_space), size=(calls, 2)).tolist()
+    actions.reverse()
+
+    def call():
+        _, _, done = env.step(actions.pop())
+        if done:
+            env.reset(pygame.HIDDEN)
+        if render:
+            env.render()
+        return done
+
+    return measure(call, calls)
+
+
+def bench_football_step(calls):
+    """FootballEnv.step with random actions, never renders."""
+    return measure_two_player_steps(FootballEnv("Football"), calls)
+
+
+def bench_football_render(calls):
+    """FootballEnv.step and render with random actions on a hidden window,
+    with pacing at max speed."""
+    return measure_two_player_steps(FootballEnv("Football"), calls, render=True)
+
+
+def bench_vector_football_step(calls, num_envs):
+    """VectorFootballEnv.step with random actions for num_envs matches."""
+    env = VectorFootballEnv("Football", num_envs)
+    env.reset(pygame.HIDDEN, seed=0)
+    actions = env.np_random.integers(len(env.action_space), size=(calls, num_envs, 2))
+    steps = iter(actions)
+
+    def call():
+        _, _, done = env.step(next(steps))
+        return int(done.sum())
+
+    return measure(call, calls, num_envs)
+
+
+def bench_capture_the_flag_step(calls):
+    """CaptureTheFlagEnv.step with random actions, never renders."""
+    return measure_two_player_steps(CaptureTheFlagEnv("Capture the flag"), calls)
+
+
+def bench_discretize(calls):
+    """Mdl.discretize of a single cartpole observation."""
+    mdl = Mdl("Mdl", None)
+    observations = np.random.default_rng(0).uniform(-0.5, 0.5, (calls, 4)).tolist()
+    observations.reverse()
+
+    def call():
+        mdl.discretize(
+            observations.pop(),
+            CARTPOLE_LOWER_BOUNDS,
+            CARTPOLE_UPPER_BOUNDS,
+            CARTPOLE_BUCKETS,
+        )
+        return 0
+
+    return measure(call, calls)
+
+
+def bench_discretize_batch(calls, batch_size):
+    """Mdl.discretize_batch of batch_size cartpole observations."""
+    mdl = Mdl("Mdl", None)
+    observations = np.random.default_rng(0).uniform(-0.5, 0.5, (batch_size, 4))
+
+    def call():
+        mdl.discretize_batch(
+            observations,
+            CARTPOLE_LOWER_BOUNDS,
+            CARTPOLE_UPPER_BOUNDS,
+            CARTPOLE_BUCKETS,
+        )
+        return 0
+
+    return measure(call, calls, batch_size)
+
+
+def run_benchmarks(scale=1.0, num_envs=1024):
+    """
+    Description:
+        Runs every benchmark
+
+    Parameters:
+        scale (float): Multiplier of the number of calls of each benchmark
+        num_envs (int): Batch size of the batched benchmarks
+
+    Returns:
+        results (dict): Benchmark name -> measure result
+    """
+
+    def n(calls):
+        return max(1, int(calls * scale))
+
+    benchmarks = {
+        "cartpole_step_headless": lambda: bench_cartpole_step(n(200_000)),
+        "cartpole_step_batched": lambda: bench_vector_cartpole_step(n(2_000), num_envs),
+        "cartpole_step_pool": lambda: bench_pool_cartpole_step(n(200), num_envs),
+        "cartpole_render_hidden": lambda: bench_cartpole_render(n(2_000)),
+        "cartpole_draw_hidden": lambda: bench_cartpole_draw(n(2_000)),
+        "football_step_headless": lambda: bench_football_step(n(20_000)),
+        "football_step_batched": lambda: bench_vector_football_step(n(200), num_envs),
+        "football_render_hidden": lambda: bench_football_render(n(2_000)),
+        "ctf_step_headless": lambda: bench_capture_the_flag_step(n(20_000)),
+        "discretize": lambda: bench_discretize(n(200_000)),
+        "discretize_batched": lambda: bench_discretize_batch(n(2_000), num_envs),
+    }
+
+    results = {}
+    for name, benchmark in benchmarks.items():
+        results[name] = benchmark()
+        print(
+            f"{name:24} | {results[name]['steps_per_sec']:14,.0f} steps/s "
+            f"| {results[name]['episodes_per_sec']:10,.1f} episodes/s "
+            f"| p50 {results[name]['latency_us']['p50']:9.2f} us "
+            f"| p99 {results[name]['latency_us']['p99']:9.2f} us"
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Environment step throughput")
+    parser.add_argument(
+        "--output", default="benchmark_results.json", help="JSON results file"
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiplier of the number of calls"
+    )
+    parser.add_argument(
+        "--num-envs", type=int, default=1024, help="Batch size of batched modes"
+    )
+    parser.add_argument(
+        "--dummy-video",
+        action="store_true",
+        help="Use SDL's dummy video driver, for machines without a display",
+    )
+    args = parser.parse_args()
+
+    if args.dummy_video:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+    results = run_benchmarks(args.scale, args.num_envs)
+
+    report = {
+        "metadata": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "num_envs": args.num_envs,
+            "scale": args.scale,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,5 @@
 import pygame
-import random
 import math
-import time
 import os
 import sys
 
@@ -15,6 +13,7 @@ project_root = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.append(project_root)
 
 from baseEnv.env import Env  # noqa: E402
+from baseEnv.pacer import FramePacer  # noqa: E402
 
 
 class CartpoleEnv(Env):
@@ -51,21 +50,28 @@ class CartpoleEnv(Env):
         self.polemass_length = self.masspole * self.length
         self.tau = 0.02
 
+        # Render one frame every tau seconds by default
+        self.pacer = FramePacer(1 / self.tau)
+
         # Angle at which to fail the episode
         self.theta_threshold_radians = 12 * 2 * math.pi / 360
         self.x_threshold = 2.4
 
         self.reset()
 
-    def reset(self, show_display=pygame.SHOWN):
+    def reset(self, show_display=pygame.SHOWN, seed=None):
         """
         Description:
             Resets the environment to its initial state
 
+        Parameters:
+            show_display (int): pygame.SHOWN or pygame.HIDDEN
+            seed (int): If given, reseeds the environment's np_random
+
         Returns:
             state (tuple): The new state of the environment
         """
-        super().reset(show_display)
+        super().reset(show_display, seed)
 
         self.reward = 0
 
@@ -79,7 +85,7 @@ class CartpoleEnv(Env):
         poleAngle: -0.418 rad to 0.418 rad
         poleVelocity: -Inf to Inf
         """
-        self.state = tuple((random.uniform(-0.05, 0.05) for _ in range(4)))
+        self.state = tuple(self.np_random.uniform(-0.05, 0.05, 4).tolist())
 
         return self.state
 
@@ -141,20 +147,69 @@ class CartpoleEnv(Env):
 
         return self.state, reward, False
 
-    def render(self):
+    def render(self, mode="human"):
         """
         Description:
             Renders the environment
+
+        Parameters:
+            mode (str): "human" or "rgb_array", see Env.render
+
+        Returns:
+            frame (np.ndarray): The frame in "rgb_array" mode
+        """
+        if mode == "rgb_array":
+            self.draw(self.get_offscreen(), self.state)
+            return super().render(mode)
+
+        display = self.begin_frame()
+        self.submit_rects(self.draw_objects(display, self.state))
+
+        super().render(mode)
+
+    def draw_background(self, surface):
+        """
+        Description:
+            Draws the static background and the ground
+
+        Parameters:
+            surface (pygame.Surface): The surface to draw on
         """
-        self.env.fill((255, 255, 255))
+        surface.fill((255, 255, 255))
 
         w, h = self.window_size
 
         # Draw the ground
-        pygame.draw.line(self.env, (50, 50, 50), (0, h // 2 + 15), (w, h // 2 + 15), 1)
+        pygame.draw.line(surface, (50, 50, 50), (0, h // 2 + 15), (w, h // 2 + 15), 1)
+
+    def draw(self, surface, state):
+        """
+        Description:
+            Draws the whole scene of the given state on a surface
+
+        Parameters:
+            surface (pygame.Surface): The surface to draw on
+            state (tuple): The state to draw
+        """
+        surface.blit(self.get_background(), (0, 0))
+        self.draw_objects(surface, state)
+
+    def draw_objects(self, surface, state):
+        """
+        Description:
+            Draws the cart and pole of the given state on a surface
+
+        Parameters:
+            surface (pygame.Surface): The surface to draw on
+            state (tuple): The state to draw
+
+        Returns:
+            rects (list(pygame.Rect)): The rects the cart and pole cover
+        """
+        w, h = self.window_size
 
         # Calculate the position of the center of the cart
-        x_1 = ((self.state[0] / 4.8) + 1) * w / 2
+        x_1 = ((state[0] / 4.8) + 1) * w / 2
         y_1 = h // 2 + 10
 
         # Calculate the position of the end of the pole
@@ -162,15 +217,14 @@ class CartpoleEnv(Env):
         end = pygame.math.Vector2(150, 0)
 
         # Rotate the pole by the angle theta, and by 90 degrees to make it point up
-        rot_end = origin + end.rotate_rad(-self.state[2] - math.pi / 2)
+        rot_end = origin + end.rotate_rad(-state[2] - math.pi / 2)
 
         # Draw the cart
-        pygame.draw.rect(self.env, (0, 0, 0), pygame.Rect(x_1 - 30, h // 2, 60, 30))
+        cart = pygame.draw.rect(
+            surface, (0, 0, 0), pygame.Rect(x_1 - 30, h // 2, 60, 30)
+        )
 
         # Draw the pole
-        pygame.draw.line(self.env, (235, 177, 52), origin, rot_end, 10)
-
-        super().render()
+        pole = pygame.draw.line(surface, (235, 177, 52), origin, rot_end, 10)
 
-        # Wait for tau seconds
-        time.sleep(self.tau)
+        return [cart, pole]
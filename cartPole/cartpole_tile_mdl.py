@@ -0,0 +1,54 @@
+import os
+import sys
+
+# Get the current script's directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the absolute path to the project's root directory
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+# Add the project's root directory to sys.path
+sys.path.append(project_root)
+
+from baseMdl.tile_mdl import TileCodingMdl  # noqa: E402
+
+
+class CartpoleTileMdl(TileCodingMdl):
+    """
+    Description:
+        Tile-coding model for the CartpoleEnv. Same bounds and exploration
+        schedule as CartpoleMdl, but the observation is covered by several
+        offset tilings instead of one bucket grid.
+    Parameters:
+        mdl_name (str): name of the model
+        environment (CartpoleEnv): environment with which it interacts
+    """
+
+    def __init__(self, mdl_name, environment):
+        """
+        Description:
+            Initializes the model
+        Parameters:
+            mdl_name (str): name of the model
+            environment (CartpoleEnv): environment with which it interacts
+        """
+        super().__init__(mdl_name, environment)
+        # For tile coding, tiles of each dimension per tiling
+        self.upper_bounds = [4.8, 3.4, 0.42, 3.4]
+        self.lower_bounds = [-4.8, -3.4, -0.42, -3.4]
+        self.buckets = (
+            4,
+            4,
+            8,
+            8,
+        )
+        self.num_tilings = 8
+        # For training
+        self.episodes = 501
+        self.alpha = 0.1
+        self.gamma = 0.99
+        # For exploration
+        self.epsilon = 1.0
+        self.min_epsilon = 0.01
+        self.max_epsilon = 1.0
+        self.decay = 0.01
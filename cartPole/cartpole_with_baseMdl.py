@@ -1,10 +1,9 @@
+import multiprocessing
 import numpy as np
 import pygame
-import random
-import math
-import time
 import os
 import sys
+from multiprocessing import connection, shared_memory
 
 # Get the current script's directory
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -15,167 +14,50 @@ project_root = os.path.abspath(os.path.join(current_dir, ".."))
 # Add the project's root directory to sys.path
 sys.path.append(project_root)
 
-from baseEnv.env import Env  # noqa: E402
+from cartPole.cartpole import CartpoleEnv  # noqa: E402, F401
+from cartPole.vector_cartpole import VectorCartpoleEnv  # noqa: E402
 from baseMdl.mdl import Mdl  # noqa: E402
 
 
-class CartpoleEnv(Env):
+def _hogwild_worker(config, shm_names, q_shape, worker, num_workers, seed):
     """
     Description:
-        A pole is attached by an un-actuated joint to a cart, which moves along a frictionless track.
-        The pendulum starts upright, and the goal is to prevent it from falling over by increasing and reducing the cart's velocity.
-        Based on:
-            - https://gymnasium.farama.org/environments/classic_control/cart_pole/
-            - https://github.com/openai/gym/blob/master/gym/envs/classic_control/cartpole.py
+        Trains on every num_workers-th episode, starting at episode worker,
+        updating the shared q_table in place without locks. Runs in one of
+        the worker processes of CartpoleMdl.train_hogwild
 
     Parameters:
-        envName (str): The name of the environment
+        config (dict): Name, env name and attributes of the trained model
+        shm_names (tuple): Shared memory blocks of the q_table, the rewards
+            and the number of episodes done by each worker
+        q_shape (tuple): Shape of the q_table
+        worker (int): Index of this worker
+        num_workers (int): Number of workers
+        seed (int): Seed of this worker's model and environment
     """
-
-    def __init__(self, envName):
-        """
-        Description:
-            Initializes the environment
-
-        Parameters:
-            envName (str): The name of the environment
-        """
-        super().__init__(envName)
-
-        # Indicates the direction of the fixed force the cart is pushed with
-        self.action_space = [0, 1]
-        self.force_mag = 10.0
-        self.gravity = 9.8
-        self.masscart = 1.0
-        self.masspole = 0.1
-        self.total_mass = self.masspole + self.masscart
-        self.length = 0.5
-        self.polemass_length = self.masspole * self.length
-        self.tau = 0.02
-
-        # Angle at which to fail the episode
-        self.theta_threshold_radians = 12 * 2 * math.pi / 360
-        self.x_threshold = 2.4
-
-        self.reset()
-
-    def reset(self, show_display=pygame.SHOWN):
-        """
-        Description:
-            Resets the environment to its initial state
-
-        Returns:
-            state (tuple): The new state of the environment
-        """
-        super().reset(show_display)
-
-        self.reward = 0
-
-        self.episode_length = 0
-
-        """
-        The state of the environment is the position of the cart, the velocity of the cart, the angle of the pole, and the angular velocity of the pole tip
-
-        cartPosition: -4.8 to 4.8
-        cartVelocity: -Inf to Inf
-        poleAngle: -0.418 rad to 0.418 rad
-        poleVelocity: -Inf to Inf
-        """
-        self.state = tuple((random.uniform(-0.05, 0.05) for _ in range(4)))
-
-        return self.state
-
-    def step(self, action):
-        """
-        Description:
-            Moves the environment one step forward in time
-
-        Parameters:
-            action (int): The action to take in the environment
-
-        Returns:
-            state (tuple): The new state of the environment
-            reward (float): The reward for the action taken
-            done (bool): Whether the episode is over
-        """
-
-        # Unpack the state
-        x, x_dot, theta, theta_dot = self.state
-
-        # Calculate the force applied to the cart, based on https://github.com/openai/gym/blob/master/gym/envs/classic_control/cartpole.py
-        force = self.force_mag if action == 1 else -self.force_mag
-
-        costheta = math.cos(theta)
-        sintheta = math.sin(theta)
-
-        temp = (
-            force + self.polemass_length * theta_dot**2 * sintheta
-        ) / self.total_mass
-        thetaacc = (self.gravity * sintheta - costheta * temp) / (
-            self.length * (4.0 / 3.0 - self.masspole * costheta**2 / self.total_mass)
-        )
-        xacc = temp - self.polemass_length * thetaacc * costheta / self.total_mass
-
-        x = x + self.tau * x_dot
-        x_dot = x_dot + self.tau * xacc
-        theta = theta + self.tau * theta_dot
-        theta_dot = theta_dot + self.tau * thetaacc
-
-        self.state = (x, x_dot, theta, theta_dot)
-
-        # Check if the episode is over
-        if self.episode_length >= 500:
-            reward = 0
-            return self.state, reward, True
-
-        # Check if the cart has moved too far to the left or right
-        if self.state[0] < -4.8 or self.state[0] > 4.8:
-            reward = 0
-            return self.state, reward, True
-
-        # Check if the pole has fallen over
-        if self.state[2] < -0.42 or self.state[2] > 0.42:
-            reward = 0
-            return self.state, reward, True
-
-        reward = 1
-        self.episode_length += 1
-
-        return self.state, reward, False
-
-    def render(self):
-        """
-        Description:
-            Renders the environment
-        """
-        self.env.fill((255, 255, 255))
-
-        w, h = self.window_size
-
-        # Draw the ground
-        pygame.draw.line(self.env, (50, 50, 50), (0, h // 2 + 15), (w, h // 2 + 15), 1)
-
-        # Calculate the position of the center of the cart
-        x_1 = ((self.state[0] / 4.8) + 1) * w / 2
-        y_1 = h // 2 + 10
-
-        # Calculate the position of the end of the pole
-        origin = pygame.math.Vector2(x_1, y_1)
-        end = pygame.math.Vector2(150, 0)
-
-        # Rotate the pole by the angle theta, and by 90 degrees to make it point up
-        rot_end = origin + end.rotate_rad(-self.state[2] - math.pi / 2)
-
-        # Draw the cart
-        pygame.draw.rect(self.env, (0, 0, 0), pygame.Rect(x_1 - 30, h // 2, 60, 30))
-
-        # Draw the pole
-        pygame.draw.line(self.env, (235, 177, 52), origin, rot_end, 10)
-
-        super().render()
-
-        # Wait for tau seconds
-        time.sleep(self.tau)
+    blocks = [shared_memory.SharedMemory(name=name) for name in shm_names]
+    mdl = rewards = done_episodes = None
+    try:
+        mdl = CartpoleMdl(config["mdl_name"], CartpoleEnv(config["env_name"]))
+        for name, value in config["attributes"].items():
+            setattr(mdl, name, value)
+        mdl.verbose = False
+        mdl.seed(seed)
+
+        mdl.q_table = np.ndarray(q_shape, np.float64, buffer=blocks[0].buf)
+        rewards = np.ndarray((mdl.episodes,), np.float64, buffer=blocks[1].buf)
+        done_episodes = np.ndarray((num_workers,), np.int64, buffer=blocks[2].buf)
+
+        for episode in range(worker, mdl.episodes, num_workers):
+            rewards[episode] = mdl.run_episode(mdl.get_epsilon(episode))
+            done_episodes[worker] += 1
+    finally:
+        # The views must go before the blocks they point into can be closed
+        if mdl is not None:
+            mdl.q_table = None
+        rewards = done_episodes = None
+        for block in blocks:
+            block.close()
 
 
 class CartpoleMdl(Mdl):
@@ -218,70 +100,45 @@ class CartpoleMdl(Mdl):
         self.max_epsilon = 1.0
         self.decay = 0.01
 
-    def train_from_scratch(self):
-        """Train new model with brand new q_table"""
-        self.q_table = np.zeros(self.buckets + (len(self.env.action_space),))
-
-        print(f"Training model from scratch for {self.episodes - 1}" f"episodes...")
-        for episode in range(self.episodes):
-            current_state = self.discretize(
-                self.env.reset(pygame.HIDDEN),
-                self.lower_bounds,
-                self.upper_bounds,
-                self.buckets,
-            )
-
-            total_reward = 0
-
-            epsilon = self.min_epsilon + (self.max_epsilon - self.min_epsilon) * np.exp(
-                -self.decay * episode
-            )
-
-            while self.env.running:
-                exp_tradeoff = random.uniform(0, 1)
-
-                if exp_tradeoff > epsilon:
-                    action = np.argmax(self.q_table[current_state])
-                else:
-                    action = random.choice(self.env.action_space)
-
-                observation, reward, done = self.env.step(action)
-
-                new_state = self.discretize(
-                    observation, self.lower_bounds, self.upper_bounds, self.buckets
-                )
-
-                total_reward += reward
-
-                self.q_table[current_state][action] += self.alpha * (
-                    reward
-                    + self.gamma * np.max(self.q_table[new_state])
-                    - self.q_table[current_state][action]
-                )
-
-                current_state = new_state
+    def greedy_action(self, observation):
+        """Return the best action of the q_table for one observation."""
+        state = self.discretize(
+            observation, self.lower_bounds, self.upper_bounds, self.buckets
+        )
+        return np.argmax(self.q_table[state])
 
-                if done:
-                    self.env.running = False
+    def run_episode(self, epsilon):
+        """
+        Description:
+            Runs one training episode, updating the q_table after every step
 
-            if not episode % 100:
-                print(
-                    f"Episode: {episode} | Reward: {total_reward} "
-                    f"| Epsilon: {epsilon}"
-                )
+        Parameters:
+            epsilon (float): Probability of taking a random action
 
-    def watch_trained_model(self):
-        """Watch model in its environment."""
+        Returns:
+            total_reward (float): The reward of the episode
+        """
         current_state = self.discretize(
-            self.env.reset(), self.lower_bounds, self.upper_bounds, self.buckets
+            self.env.reset(pygame.HIDDEN),
+            self.lower_bounds,
+            self.upper_bounds,
+            self.buckets,
         )
+
         total_reward = 0
 
-        print("Watching trained model...")
         while self.env.running:
-            self.env.render()
+            # Action values of the current state, a view into the q_table
+            q_values = self.q_table[current_state]
+
+            exp_tradeoff = self.np_random.random()
 
-            action = np.argmax(self.q_table[current_state])
+            if exp_tradeoff > epsilon:
+                action = np.argmax(q_values)
+            else:
+                action = self.env.action_space[
+                    int(self.np_random.random() * len(self.env.action_space))
+                ]
 
             observation, reward, done = self.env.step(action)
 
@@ -291,9 +148,193 @@ class CartpoleMdl(Mdl):
 
             total_reward += reward
 
+            q_values[action] += self.alpha * (
+                reward + self.gamma * np.max(self.q_table[new_state]) - q_values[action]
+            )
+
             current_state = new_state
 
             if done:
                 self.env.running = False
-                print(f"Total Reward: {total_reward}")
-        print("Finished watching trained model...")
+
+        return total_reward
+
+    def train_batched(self, num_envs=32):
+        """Train new model with brand new q_table, running num_envs episodes
+        in lockstep on a VectorCartpoleEnv"""
+        if self.sparse_q_table:
+            raise ValueError("train_batched needs a dense q_table")
+        self.q_table = self.new_q_table(len(self.env.action_space))
+        self.rewards = np.zeros(self.episodes)
+        action_space = np.asarray(self.env.action_space)
+        envs = VectorCartpoleEnv(self.env.envName, num_envs)
+
+        if self.verbose:
+            print(
+                f"Training model from scratch for {self.episodes - 1} episodes "
+                f"on {num_envs} environments..."
+            )
+        # The batch gets its own stream, drawn from the model's generator
+        current_state = self.discretize_batch(
+            envs.reset(pygame.HIDDEN, seed=int(self.np_random.integers(2**63))),
+            self.lower_bounds,
+            self.upper_bounds,
+            self.buckets,
+        )
+
+        # Episode each sub-environment is running, the ones past the episode
+        # budget keep stepping but their updates are masked out
+        episode = np.arange(num_envs)
+        active = episode < self.episodes
+        next_episode = num_envs
+        total_reward = np.zeros(num_envs)
+
+        while active.any():
+            epsilon = self.get_epsilon(episode)
+
+            exp_tradeoff = self.np_random.random(num_envs)
+            action = np.where(
+                exp_tradeoff > epsilon,
+                np.argmax(self.q_table[current_state], axis=1),
+                action_space[self.np_random.integers(len(action_space), size=num_envs)],
+            )
+
+            observation, reward, done = envs.step(action)
+
+            # Bootstrap from the state each episode ended in, not the reset one
+            new_state = self.discretize_batch(
+                envs.final_state, self.lower_bounds, self.upper_bounds, self.buckets
+            )
+
+            total_reward += reward
+
+            # Scatter the updates so repeated (state, action) pairs add up
+            q_index = self.q_index(current_state, action)
+            td = (
+                reward
+                + self.gamma * np.max(self.q_table[new_state], axis=1)
+                - self.q_table[q_index]
+            )
+            np.add.at(
+                self.q_table,
+                tuple(index[active] for index in q_index),
+                self.alpha * td[active],
+            )
+
+            current_state = new_state
+            if done.any():
+                current_state = self.discretize_batch(
+                    observation, self.lower_bounds, self.upper_bounds, self.buckets
+                )
+
+                finished = np.flatnonzero(done & active)
+                self.rewards[episode[finished]] = total_reward[finished]
+                for i in finished:
+                    if self.verbose and not episode[i] % 100:
+                        print(
+                            f"Episode: {episode[i]} | Reward: {total_reward[i]} "
+                            f"| Epsilon: {epsilon[i]}"
+                        )
+                episode[finished] = np.arange(
+                    next_episode, next_episode + len(finished)
+                )
+                next_episode += len(finished)
+                active[finished] = episode[finished] < self.episodes
+                total_reward[done] = 0
+
+    def train_hogwild(
+        self, num_workers=None, snapshot_seconds=None, on_snapshot=None, context=None
+    ):
+        """
+        Description:
+            Train new model with brand new q_table, with num_workers processes
+            running their own headless CartpoleEnv. Every worker applies its
+            updates directly to one q_table in shared memory, without locks
+            (Hogwild): a rare concurrent update of the same entry is lost,
+            which Q-learning tolerates. Episodes are dealt to the workers in
+            turn, each one keeps the epsilon of its episode number.
+
+        Parameters:
+            num_workers (int): Number of worker processes, one per core if None
+            snapshot_seconds (float): Seconds between snapshots, None for none
+            on_snapshot (callable): Called in this process with a copy of the
+                q_table and the number of episodes done at every snapshot,
+                e.g. to save it for evaluation
+            context (str): multiprocessing start method, the default one if
+                None
+        """
+        if self.sparse_q_table:
+            raise ValueError("train_hogwild needs a dense q_table")
+        num_workers = num_workers or os.cpu_count()
+        q_table = self.new_q_table(len(self.env.action_space))
+
+        config = {
+            "mdl_name": self.mdlName,
+            "env_name": self.env.envName,
+            "attributes": {
+                name: getattr(self, name)
+                for name in self.HYPERPARAMETERS
+                + ("lower_bounds", "upper_bounds", "buckets", "flat_q_table")
+            },
+        }
+        # One stream per worker, drawn from the model's generator
+        seeds = self.np_random.integers(2**63, size=num_workers).tolist()
+
+        sizes = (q_table.nbytes, self.episodes * 8, num_workers * 8)
+        blocks = [
+            shared_memory.SharedMemory(create=True, size=max(1, size)) for size in sizes
+        ]
+        shared_q_table = np.ndarray(q_table.shape, np.float64, buffer=blocks[0].buf)
+        rewards = np.ndarray((self.episodes,), np.float64, buffer=blocks[1].buf)
+        done_episodes = np.ndarray((num_workers,), np.int64, buffer=blocks[2].buf)
+        shared_q_table[...] = q_table
+        rewards[...] = 0
+        done_episodes[...] = 0
+
+        ctx = multiprocessing.get_context(context)
+        shm_names = tuple(block.name for block in blocks)
+        processes = [
+            ctx.Process(
+                target=_hogwild_worker,
+                args=(config, shm_names, q_table.shape, worker, num_workers, seed),
+                daemon=True,
+            )
+            for worker, seed in enumerate(seeds)
+        ]
+
+        if self.verbose:
+            print(
+                f"Training model from scratch for {self.episodes - 1} episodes "
+                f"on {num_workers} processes..."
+            )
+        try:
+            for process in processes:
+                process.start()
+
+            running = [process.sentinel for process in processes]
+            while running:
+                finished = connection.wait(running, timeout=snapshot_seconds)
+                running = [sentinel for sentinel in running if sentinel not in finished]
+
+                if snapshot_seconds is not None and running:
+                    episodes_done = int(done_episodes.sum())
+                    if on_snapshot is not None:
+                        on_snapshot(shared_q_table.copy(), episodes_done)
+                    if self.verbose:
+                        print(f"Episodes: {episodes_done} / {self.episodes}")
+
+            for process in processes:
+                process.join()
+            if any(process.exitcode != 0 for process in processes):
+                raise RuntimeError("A train_hogwild worker failed")
+
+            self.q_table = shared_q_table.copy()
+            self.rewards = rewards.copy()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            shared_q_table = rewards = done_episodes = None
+            for block in blocks:
+                block.close()
+                block.unlink()
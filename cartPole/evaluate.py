@@ -0,0 +1,157 @@
+import argparse
+import numpy as np
+import pygame
+import time
+import os
+import sys
+
+# Get the current script's directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the absolute path to the project's root directory
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+# Add the project's root directory to sys.path
+sys.path.append(project_root)
+
+from baseMdl.store import ModelStore  # noqa: E402
+from cartPole.cartpole import CartpoleEnv  # noqa: E402
+from cartPole.cartpole_tile_mdl import CartpoleTileMdl  # noqa: E402
+from cartPole.cartpole_with_baseMdl import CartpoleMdl  # noqa: E402
+from cartPole.vector_cartpole import VectorCartpoleEnv  # noqa: E402
+
+# Model classes by the mdl_class of the saved metadata, models saved without
+# it are CartpoleMdl
+MODEL_CLASSES = {
+    "CartpoleMdl": CartpoleMdl,
+    "CartpoleTileMdl": CartpoleTileMdl,
+}
+
+LENGTH_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def evaluate_mdl(mdl, num_episodes=100, seed=0):
+    """
+    Description:
+        Runs num_episodes greedy episodes of a model at once on a
+        VectorCartpoleEnv, one episode per sub-environment. The same seed
+        gives every model the same starting states.
+
+    Parameters:
+        mdl (Mdl): The model, with its q_table loaded
+        num_episodes (int): The number of episodes
+        seed (int): Seed of the starting states
+
+    Returns:
+        result (dict): Return and episode length of every episode, and their
+            statistics
+    """
+    envs = VectorCartpoleEnv("Cartpole", num_episodes)
+    observation = envs.reset(pygame.HIDDEN, seed=seed)
+
+    returns = np.zeros(num_episodes)
+    lengths = np.zeros(num_episodes, dtype=np.int64)
+    running = np.ones(num_episodes, dtype=bool)
+
+    # Finished sub-environments restart, their new episodes are ignored
+    while running.any():
+        observation, reward, done = envs.step(mdl.greedy_actions(observation))
+        returns += reward * running
+        lengths += running
+        running &= ~done
+
+    return {
+        "returns": returns,
+        "lengths": lengths,
+        "mean_return": float(returns.mean()),
+        "std_return": float(returns.std()),
+        "min_return": float(returns.min()),
+        "max_return": float(returns.max()),
+        "mean_length": float(lengths.mean()),
+        "length_percentiles": {
+            f"p{q}": float(np.percentile(lengths, q)) for q in LENGTH_PERCENTILES
+        },
+        "length_histogram": np.bincount(lengths).tolist(),
+    }
+
+
+def load_mdl(name, store):
+    """
+    Description:
+        Loads a saved model, memory-mapped read-only, as the class recorded
+        in its metadata
+
+    Parameters:
+        name (str): Name of the model in the store
+        store (ModelStore): The store of the model
+
+    Returns:
+        mdl (Mdl): The loaded model
+    """
+    mdl_class = MODEL_CLASSES[store.load_metadata(name).get("mdl_class", "CartpoleMdl")]
+    mdl = mdl_class(name, CartpoleEnv("Cartpole"))
+    mdl.verbose = False
+    mdl.load_model(name, store=store)
+    return mdl
+
+
+def evaluate_models(names, store, num_episodes=100, seed=0):
+    """
+    Description:
+        Evaluates saved models on the same seeded episodes
+
+    Parameters:
+        names (list(str)): Names of the models in the store
+        store (ModelStore): The store of the models
+        num_episodes (int): The number of episodes per model
+        seed (int): Seed of the starting states, shared by every model
+
+    Returns:
+        results (dict): Model name -> evaluate_mdl result, plus the
+            evaluation time
+    """
+    results = {}
+    for name in names:
+        start = time.perf_counter()
+        results[name] = evaluate_mdl(load_mdl(name, store), num_episodes, seed)
+        results[name]["eval_time"] = time.perf_counter() - start
+    return results
+
+
+def print_results(results):
+    """Prints one line per model, best mean return first."""
+    for name, result in sorted(
+        results.items(), key=lambda item: item[1]["mean_return"], reverse=True
+    ):
+        percentiles = result["length_percentiles"]
+        print(
+            f"{name:24} | Return: {result['mean_return']:7.2f} "
+            f"+- {result['std_return']:6.2f} "
+            f"[{result['min_return']:5.0f}, {result['max_return']:5.0f}] "
+            f"| Length p5/p50/p95: {percentiles['p5']:5.0f} "
+            f"{percentiles['p50']:5.0f} {percentiles['p95']:5.0f} "
+            f"| Time: {result['eval_time']:5.2f}s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate saved cartpole models")
+    parser.add_argument(
+        "names", nargs="*", help="Models to evaluate, every model if none"
+    )
+    parser.add_argument(
+        "--models-dir",
+        default=os.path.join(project_root, "savedModels"),
+        help="Directory of the models",
+    )
+    parser.add_argument("--episodes", type=int, default=100, help="Episodes per model")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the episodes")
+    args = parser.parse_args()
+
+    store = ModelStore(args.models_dir)
+    names = args.names or store.list_models()
+    print_results(evaluate_models(names, store, args.episodes, args.seed))
+
+
+if __name__ == "__main__":
+    main()
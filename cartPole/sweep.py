@@ -0,0 +1,156 @@
+import concurrent.futures
+import functools
+import itertools
+import numpy as np
+import time
+import os
+import sys
+
+# Get the current script's directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the absolute path to the project's root directory
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+# Add the project's root directory to sys.path
+sys.path.append(project_root)
+
+from baseEnv.pool import EnvInstancePool  # noqa: E402
+from cartPole.cartpole_with_baseMdl import CartpoleEnv, CartpoleMdl  # noqa: E402
+
+# Environments of this process, reused by the runs a sweep worker trains
+ENV_POOL = EnvInstancePool(functools.partial(CartpoleEnv, "Cartpole"))
+
+# CartpoleMdl attributes a configuration may set, besides num_envs
+CONFIG_ATTRIBUTES = CartpoleMdl.HYPERPARAMETERS + (
+    "buckets",
+    "lower_bounds",
+    "upper_bounds",
+)
+
+
+def grid_search(space):
+    """
+    Description:
+        Builds every combination of the values in a search space
+
+    Parameters:
+        space (dict): CartpoleMdl attribute name -> list of values to try
+
+    Returns:
+        configs (list(dict)): One dict of attribute values per combination
+    """
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*space.values())]
+
+
+def random_search(space, num_configs, seed=None):
+    """
+    Description:
+        Samples random configurations from a search space
+
+    Parameters:
+        space (dict): CartpoleMdl attribute name -> list of values to choose
+            from, or a callable that takes a numpy Generator and returns a value
+        num_configs (int): The number of configurations to sample
+        seed (int): Seed of the sampling
+
+    Returns:
+        configs (list(dict)): The sampled configurations
+    """
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(num_configs):
+        config = {}
+        for name, values in space.items():
+            if callable(values):
+                config[name] = values(rng)
+            else:
+                config[name] = values[rng.integers(len(values))]
+        configs.append(config)
+    return configs
+
+
+def train_config(config, seed):
+    """
+    Description:
+        Trains a CartpoleMdl with the given hyperparameters on a headless
+        CartpoleEnv from ENV_POOL. Runs inside the sweep worker processes.
+
+    Parameters:
+        config (dict): CartpoleMdl attribute name -> value, one of
+            CONFIG_ATTRIBUTES. The extra key num_envs trains with
+            train_batched on that many environments.
+        seed (int): Seed of the model and environment generators
+
+    Returns:
+        result (dict): The config, seed, reward of every episode, mean reward
+            of the last 100 episodes, training time and trained q_table
+    """
+    unknown = set(config) - set(CONFIG_ATTRIBUTES) - {"num_envs"}
+    if unknown:
+        raise ValueError(
+            f"Unknown config keys {sorted(unknown)}, expected num_envs or one "
+            f"of {CONFIG_ATTRIBUTES}"
+        )
+
+    with ENV_POOL.env() as env:
+        mdl = CartpoleMdl("CartpoleMdl", env)
+        mdl.seed(seed)
+        mdl.verbose = False
+
+        num_envs = None
+        for name, value in config.items():
+            if name == "num_envs":
+                num_envs = value
+            else:
+                setattr(mdl, name, value)
+
+        start = time.perf_counter()
+        if num_envs is None:
+            mdl.train_from_scratch()
+        else:
+            mdl.train_batched(num_envs)
+        train_time = time.perf_counter() - start
+
+    return {
+        "config": config,
+        "seed": seed,
+        "rewards": mdl.rewards,
+        "mean_reward": float(np.mean(mdl.rewards[-100:])),
+        "train_time": train_time,
+        "q_table": mdl.q_table,
+    }
+
+
+def run_sweep(configs, max_workers=None, seed=0):
+    """
+    Description:
+        Trains one CartpoleMdl per configuration, spread over a pool of
+        worker processes. Every run gets its own seed derived from seed.
+
+    Parameters:
+        configs (list(dict)): Configurations from grid_search or random_search
+        max_workers (int): Number of worker processes, one per core if None
+        seed (int): Root seed of the sweep
+
+    Returns:
+        results (list(dict)): The train_config result of each configuration,
+            in the same order as configs
+    """
+    seeds = [
+        int(seq.generate_state(1)[0])
+        for seq in np.random.SeedSequence(seed).spawn(len(configs))
+    ]
+    max_workers = max_workers or os.cpu_count()
+    with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+        return list(executor.map(train_config, configs, seeds))
+
+
+def print_results(results):
+    """Prints one line per result, best mean reward first."""
+    for result in sorted(results, key=lambda r: r["mean_reward"], reverse=True):
+        print(
+            f"Mean reward: {result['mean_reward']:8.2f} "
+            f"| Time: {result['train_time']:6.2f}s | {result['config']}"
+        )
@@ -0,0 +1,171 @@
+import numpy as np
+import pygame
+import os
+import sys
+
+# Get the current script's directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the absolute path to the project's root directory
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+# Add the project's root directory to sys.path
+sys.path.append(project_root)
+
+from cartPole.cartpole import CartpoleEnv  # noqa: E402
+from baseEnv.vector import step_subset  # noqa: E402
+
+
+class VectorCartpoleEnv(CartpoleEnv):
+    """
+    Description:
+        Batch of independent cartpoles stepped together as NumPy arrays.
+        Uses the same equations and termination rules as CartpoleEnv, but the
+        state of every sub-environment lives in one (num_envs, 4) array.
+        Sub-environments that finish are reset automatically on the same
+        step, the state they finished in is kept in final_state.
+
+    Parameters:
+        envName (str): The name of the environment
+        num_envs (int): The number of cartpoles to simulate
+    """
+
+    def __init__(self, envName, num_envs):
+        """
+        Description:
+            Initializes the environment
+
+        Parameters:
+            envName (str): The name of the environment
+            num_envs (int): The number of cartpoles to simulate
+        """
+        self.num_envs = num_envs
+
+        super().__init__(envName)
+
+    # Arrays holding the state of each sub-environment, see step
+    STATE_ARRAYS = ("state", "final_state", "episode_length")
+
+    def reset(self, show_display=pygame.SHOWN, seed=None):
+        """
+        Description:
+            Resets every sub-environment to its initial state
+
+        Parameters:
+            show_display (int): pygame.SHOWN or pygame.HIDDEN
+            seed (int): If given, reseeds the environment's np_random
+
+        Returns:
+            state (np.ndarray): (num_envs, 4) array with the new states
+        """
+        # Skip CartpoleEnv.reset, the state is drawn for all cartpoles below
+        super(CartpoleEnv, self).reset(show_display, seed)
+
+        self.episode_length = np.zeros(self.num_envs, dtype=np.int64)
+        self.state = self.np_random.uniform(-0.05, 0.05, (self.num_envs, 4))
+        self.final_state = self.state.copy()
+
+        return self.state
+
+    def reset_envs(self, indices):
+        """
+        Description:
+            Resets some of the sub-environments to their initial state
+
+        Parameters:
+            indices (np.ndarray): Indices of the sub-environments to reset
+
+        Returns:
+            state (np.ndarray): (len(indices), 4) array with their new states
+        """
+        self.state[indices] = self.np_random.uniform(-0.05, 0.05, (len(indices), 4))
+        self.final_state[indices] = self.state[indices]
+        self.episode_length[indices] = 0
+        return self.state[indices]
+
+    def step(self, actions, indices=None):
+        """
+        Description:
+            Moves every sub-environment, or the given ones, one step forward
+            in time
+
+        Parameters:
+            actions (np.ndarray): (num_envs,) array with the action of each
+                sub-environment, or (len(indices),) with indices
+            indices (np.ndarray): Indices of the sub-environments to step,
+                all of them if None. The others don't move
+
+        Returns:
+            state (np.ndarray): (num_envs, 4) array with the new states,
+                finished sub-environments already hold their reset state
+            reward (np.ndarray): (num_envs,) array with the rewards
+            done (np.ndarray): (num_envs,) bool array, True where the episode
+                ended on this step
+            With indices, the rows of the stepped sub-environments only
+        """
+        if indices is not None:
+            return step_subset(self, actions, indices)
+
+        x, x_dot, theta, theta_dot = self.state.T
+
+        force = np.where(np.asarray(actions) == 1, self.force_mag, -self.force_mag)
+
+        costheta = np.cos(theta)
+        sintheta = np.sin(theta)
+
+        temp = (
+            force + self.polemass_length * theta_dot**2 * sintheta
+        ) / self.total_mass
+        thetaacc = (self.gravity * sintheta - costheta * temp) / (
+            self.length * (4.0 / 3.0 - self.masspole * costheta**2 / self.total_mass)
+        )
+        xacc = temp - self.polemass_length * thetaacc * costheta / self.total_mass
+
+        self.final_state = np.stack(
+            (
+                x + self.tau * x_dot,
+                x_dot + self.tau * xacc,
+                theta + self.tau * theta_dot,
+                theta_dot + self.tau * thetaacc,
+            ),
+            axis=1,
+        )
+
+        # Episode cap, cart too far to the left or right, or pole fallen over
+        done = (
+            (self.episode_length >= 500)
+            | (np.abs(self.final_state[:, 0]) > 4.8)
+            | (np.abs(self.final_state[:, 2]) > 0.42)
+        )
+        reward = (~done).astype(np.float64)
+        self.episode_length += ~done
+
+        self.state = self.final_state
+        if done.any():
+            # Reset the finished sub-environments in place
+            self.state = self.final_state.copy()
+            self.state[done] = self.np_random.uniform(-0.05, 0.05, (done.sum(), 4))
+            self.episode_length[done] = 0
+
+        return self.state, reward, done
+
+    def render(self, mode="human", index=0):
+        """
+        Description:
+            Renders one of the sub-environments
+
+        Parameters:
+            mode (str): "human" or "rgb_array", see Env.render
+            index (int): The sub-environment to render
+
+        Returns:
+            frame (np.ndarray): The frame in "rgb_array" mode
+        """
+        if mode == "rgb_array":
+            self.draw(self.get_offscreen(), self.state[index])
+            return super(CartpoleEnv, self).render(mode)
+
+        display = self.begin_frame()
+        self.submit_rects(self.draw_objects(display, self.state[index]))
+
+        super(CartpoleEnv, self).render(mode)
@@ -0,0 +1,34 @@
+import os
+import sys
+
+# Get the current script's directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the absolute path to the project's root directory
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+# Add the project's root directory to sys.path
+sys.path.append(project_root)
+
+from cartPole.sweep import grid_search, print_results, run_sweep  # noqa: E402
+
+
+def main():
+    configs = grid_search(
+        {
+            "alpha": [0.05, 0.1, 0.2],
+            "gamma": [0.9, 0.99],
+            "decay": [0.01, 0.005],
+            "buckets": [(1, 1, 6, 5), (1, 1, 12, 10)],
+        }
+    )
+
+    print(f"Training {len(configs)} models...")
+    results = run_sweep(configs)
+
+    print_results(results)
+
+
+# Required where the sweep workers re-import this script (spawn start method)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import os
+import sys
+
+# Get the current script's directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the absolute path to the project's root directory
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+# Add the project's root directory to sys.path
+sys.path.append(project_root)
+
+from baseEnv.server import EnvServer  # noqa: E402
+from cartPole.vector_cartpole import VectorCartpoleEnv  # noqa: E402
+from game.vector_football import VectorFootballEnv  # noqa: E402
+
+# Environment name -> (builder of a vector env of n slots, action shape)
+ENVS = {
+    "cartpole": (lambda n: VectorCartpoleEnv("Cartpole", n), ()),
+    "football": (lambda n: VectorFootballEnv("Football", n), (2,)),
+}
+
+
+async def serve(args):
+    make_env, action_shape = ENVS[args.env]
+    server = EnvServer(
+        make_env(args.max_clients), action_shape, args.batch_delay, args.seed
+    )
+    if args.unix:
+        listener = await server.start_unix(args.unix)
+        print(f"Serving {args.env} on {args.unix}")
+    else:
+        listener = await server.start_tcp(args.host, args.port)
+        host, port = listener.sockets[0].getsockname()[:2]
+        print(f"Serving {args.env} on {host}:{port}")
+
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve environments over a socket")
+    parser.add_argument("--env", choices=sorted(ENVS), default="cartpole")
+    parser.add_argument(
+        "--max-clients", type=int, default=64, help="Environments to serve"
+    )
+    parser.add_argument("--unix", help="Unix socket path, TCP if not given")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument(
+        "--batch-delay",
+        type=float,
+        default=0.0,
+        help="Seconds to wait for more step requests before stepping a batch",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
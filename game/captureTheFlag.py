@@ -1,12 +1,19 @@
 import pygame
+import os
 import sys
 
-# Initialize Pygame
-pygame.init()
-clock = pygame.time.Clock()
-font = pygame.font.Font(
-    None, 36
-)  # Choose the font for the score, None means default font
+# Get the current script's directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the absolute path to the project's root directory
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+# Add the project's root directory to sys.path
+sys.path.append(project_root)
+
+from baseEnv.env import Env  # noqa: E402
+from baseEnv.pacer import FramePacer  # noqa: E402
+from game.common import MOVES, ScoreText, get_keyboard_moves  # noqa: E402
 
 # Set the frames per second (FPS)
 FPS = 60
@@ -16,88 +23,267 @@ WIDTH, HEIGHT = 800, 600
 PLAYER_SIZE = 50
 FLAG_SIZE = 20
 PLAYER_SPEED = 5
-HALF_WIDTH = WIDTH // 2
 
 # Colors
 RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 WHITE = (255, 255, 255)  # Color for the dividing line
 
-# Set up the display
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-
-# Set up the players and flags
-player1 = pygame.Rect(0, HEIGHT // 2, PLAYER_SIZE, PLAYER_SIZE)
-player2 = pygame.Rect(WIDTH - PLAYER_SIZE, HEIGHT // 2, PLAYER_SIZE, PLAYER_SIZE)
-flag1 = pygame.Rect(0, 0, FLAG_SIZE, FLAG_SIZE)
-flag2 = pygame.Rect(WIDTH - FLAG_SIZE, HEIGHT - FLAG_SIZE, FLAG_SIZE, FLAG_SIZE)
-
-# Scoring
-score1 = 0
-score2 = 0
-
-# Game loop
-while True:
-    clock.tick(FPS)
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-
-    keys = pygame.key.get_pressed()
-    if keys[pygame.K_w] and player1.y - PLAYER_SPEED > 0:
-        player1.y -= PLAYER_SPEED
-    if keys[pygame.K_s] and player1.y + PLAYER_SPEED < HEIGHT - PLAYER_SIZE:
-        player1.y += PLAYER_SPEED
-    if keys[pygame.K_a] and player1.x - PLAYER_SPEED > 0:
-        player1.x -= PLAYER_SPEED
-    if keys[pygame.K_d] and player1.x + PLAYER_SPEED < WIDTH - PLAYER_SIZE:
-        player1.x += PLAYER_SPEED
-
-    if keys[pygame.K_UP] and player2.y - PLAYER_SPEED > 0:
-        player2.y -= PLAYER_SPEED
-    if keys[pygame.K_DOWN] and player2.y + PLAYER_SPEED < HEIGHT - PLAYER_SIZE:
-        player2.y += PLAYER_SPEED
-    if keys[pygame.K_LEFT] and player2.x - PLAYER_SPEED > 0:
-        player2.x -= PLAYER_SPEED
-    if keys[pygame.K_RIGHT] and player2.x + PLAYER_SPEED < WIDTH - PLAYER_SIZE:
-        player2.x += PLAYER_SPEED
-
-    # Scoring
-    if player1.colliderect(flag2):
-        score1 += 1
-        player1.x = 0
-        player1.y = HEIGHT // 2
-        player2.x = WIDTH - PLAYER_SIZE
-        player2.y = HEIGHT // 2
-    if player2.colliderect(flag1):
-        score2 += 1
-        player1.x = 0
-        player1.y = HEIGHT // 2
-        player2.x = WIDTH - PLAYER_SIZE
-        player2.y = HEIGHT // 2
-
-    # Player reset
-    if player1.colliderect(player2) and player1.x + PLAYER_SIZE / 2 > HALF_WIDTH:
-        player1.x = 0
-        player1.y = HEIGHT // 2
-    if player2.colliderect(player1) and player2.x + PLAYER_SIZE / 2 < HALF_WIDTH:
-        player2.x = WIDTH - PLAYER_SIZE
-        player2.y = HEIGHT // 2
-
-    # Draw everything
-    screen.fill((0, 0, 0))
-    pygame.draw.rect(screen, RED, player1)
-    pygame.draw.rect(screen, BLUE, player2)
-    pygame.draw.rect(screen, RED, flag1)
-    pygame.draw.rect(screen, BLUE, flag2)
-
-    # Draw the scores
-    score_text = font.render(f"Player 1: {score1} Player 2: {score2}", True, WHITE)
-    screen.blit(score_text, (20, 20))  # Adjust the position as needed
-
-    # Draw the dividing line
-    pygame.draw.line(screen, WHITE, (HALF_WIDTH, 0), (HALF_WIDTH, HEIGHT), 2)
-
-    # Update the display
-    pygame.display.flip()
+
+class CaptureTheFlagEnv(Env):
+    """
+    Description:
+        Two player capture the flag game as an environment.
+        Each player starts on its side of the field and scores by touching
+        the flag of the other player. A player touched while in the other
+        player's half is sent back to its start.
+        step only updates the game logic, nothing is drawn until render is
+        called, so games can be simulated without a display.
+
+    Parameters:
+        envName (str): The name of the environment
+        width (int): The width of the environment window
+        height (int): The height of the environment window
+        max_steps (int): The number of steps a game lasts
+    """
+
+    # (left, right, up, down) pressed for each action, see game.common
+    MOVES = MOVES
+
+    def __init__(self, envName, width=WIDTH, height=HEIGHT, max_steps=3600):
+        """
+        Description:
+            Initializes the environment
+
+        Parameters:
+            envName (str): The name of the environment
+            width (int): The width of the environment window
+            height (int): The height of the environment window
+            max_steps (int): The number of steps a game lasts
+        """
+        super().__init__(envName, width, height)
+
+        self.action_space = list(range(len(CaptureTheFlagEnv.MOVES)))
+        self.max_steps = max_steps
+        self.half_width = width // 2
+
+        # Starting positions of the players, the flags never move
+        self.player1_start = (0, height // 2)
+        self.player2_start = (width - PLAYER_SIZE, height // 2)
+        self.flag1 = pygame.Rect(0, 0, FLAG_SIZE, FLAG_SIZE)
+        self.flag2 = pygame.Rect(
+            width - FLAG_SIZE, height - FLAG_SIZE, FLAG_SIZE, FLAG_SIZE
+        )
+
+        # Score line, rendered once per scores
+        self.score_text = ScoreText(WHITE)
+
+        # Render at the 60 ticks per second the game is designed for
+        self.pacer = FramePacer(FPS)
+
+        self.reset()
+
+    def reset(self, show_display=pygame.SHOWN, seed=None):
+        """
+        Description:
+            Resets the game with both players at their start and both scores
+            at 0
+
+        Parameters:
+            show_display (int): pygame.SHOWN or pygame.HIDDEN
+            seed (int): If given, reseeds the environment's np_random
+
+        Returns:
+            state (tuple): The new state of the environment
+        """
+        super().reset(show_display, seed)
+
+        self.player1 = pygame.Rect(self.player1_start, (PLAYER_SIZE, PLAYER_SIZE))
+        self.player2 = pygame.Rect(self.player2_start, (PLAYER_SIZE, PLAYER_SIZE))
+        self.score1 = 0
+        self.score2 = 0
+        self.reward = (0, 0)
+        self.episode_length = 0
+
+        return self.get_state()
+
+    def get_state(self):
+        """
+        Description:
+            Returns the state of the game
+
+        Returns:
+            state (tuple): Top-left corner of each player
+        """
+        return (self.player1.x, self.player1.y, self.player2.x, self.player2.y)
+
+    def move_player(self, player, left, right, up, down):
+        """Move a player by PLAYER_SPEED for each pressed direction, as long
+        as it stays strictly inside the field."""
+        width, height = self.window_size
+        if up and player.y - PLAYER_SPEED > 0:
+            player.y -= PLAYER_SPEED
+        if down and player.y + PLAYER_SPEED < height - PLAYER_SIZE:
+            player.y += PLAYER_SPEED
+        if left and player.x - PLAYER_SPEED > 0:
+            player.x -= PLAYER_SPEED
+        if right and player.x + PLAYER_SPEED < width - PLAYER_SIZE:
+            player.x += PLAYER_SPEED
+
+    def update(self, moves):
+        """
+        Description:
+            Moves the players and applies the scoring and tagging rules
+
+        Parameters:
+            moves (tuple): (left, right, up, down) pressed for each player
+
+        Returns:
+            reward (tuple(int, int)): 1 for the player that scored on this
+                update, -1 for the other one, 0 otherwise
+        """
+        self.move_player(self.player1, *moves[0])
+        self.move_player(self.player2, *moves[1])
+
+        # Scoring
+        reward1 = 0
+        if self.player1.colliderect(self.flag2):
+            self.score1 += 1
+            reward1 += 1
+            self.player1.topleft = self.player1_start
+            self.player2.topleft = self.player2_start
+        if self.player2.colliderect(self.flag1):
+            self.score2 += 1
+            reward1 -= 1
+            self.player1.topleft = self.player1_start
+            self.player2.topleft = self.player2_start
+
+        # Player reset
+        if (
+            self.player1.colliderect(self.player2)
+            and self.player1.x + PLAYER_SIZE / 2 > self.half_width
+        ):
+            self.player1.topleft = self.player1_start
+        if (
+            self.player2.colliderect(self.player1)
+            and self.player2.x + PLAYER_SIZE / 2 < self.half_width
+        ):
+            self.player2.topleft = self.player2_start
+
+        return (reward1, -reward1)
+
+    def step(self, actions):
+        """
+        Description:
+            Moves the game one tick forward
+
+        Parameters:
+            actions (tuple(int, int)): The action of each player
+
+        Returns:
+            state (tuple): The new state of the environment
+            reward (tuple(int, int)): 1 for the player that scored on this
+                step, -1 for the other one, 0 otherwise
+            done (bool): Whether the game is over
+        """
+        self.reward = self.update(
+            (CaptureTheFlagEnv.MOVES[actions[0]], CaptureTheFlagEnv.MOVES[actions[1]])
+        )
+
+        self.episode_length += 1
+        done = self.episode_length >= self.max_steps
+
+        return self.get_state(), self.reward, done
+
+    def draw_background(self, surface):
+        """
+        Description:
+            Draws the parts that only change when a player scores: the
+            flags, the dividing line and the scores
+
+        Parameters:
+            surface (pygame.Surface): Surface to draw on
+
+        Returns:
+            rects (list(pygame.Rect)): The area of the scores
+        """
+        super().draw_background(surface)
+        pygame.draw.rect(surface, RED, self.flag1)
+        pygame.draw.rect(surface, BLUE, self.flag2)
+
+        # Draw the dividing line
+        pygame.draw.line(
+            surface,
+            WHITE,
+            (self.half_width, 0),
+            (self.half_width, self.window_size[1]),
+            2,
+        )
+
+        # Draw the scores
+        scores = (self.score1, self.score2)
+        return [surface.blit(self.score_text.get(scores), (20, 20))]
+
+    def get_background_key(self):
+        """The background is drawn again when a player scores."""
+        return (self.score1, self.score2)
+
+    def draw_objects(self, surface):
+        """
+        Description:
+            Draws the players
+
+        Parameters:
+            surface (pygame.Surface): Surface to draw on
+
+        Returns:
+            rects (list(pygame.Rect)): The areas drawn on
+        """
+        pygame.draw.rect(surface, RED, self.player1)
+        pygame.draw.rect(surface, BLUE, self.player2)
+        return [self.player1.copy(), self.player2.copy()]
+
+    def draw(self, surface):
+        """
+        Description:
+            Draws the whole game
+
+        Parameters:
+            surface (pygame.Surface): Surface to draw on
+        """
+        surface.blit(self.get_background(), (0, 0))
+        self.draw_objects(surface)
+
+    def render(self, mode="human"):
+        """
+        Description:
+            Renders the environment
+
+        Parameters:
+            mode (str): "human" or "rgb_array", see Env.render
+
+        Returns:
+            frame (np.ndarray): The frame in "rgb_array" mode
+        """
+        if mode == "rgb_array":
+            self.draw(self.get_offscreen())
+            return super().render(mode)
+
+        display = self.begin_frame()
+        self.submit_rects(self.draw_objects(display))
+
+        super().render(mode)
+
+
+def main():
+    # Set up the game
+    env = CaptureTheFlagEnv("Capture the Flag")
+
+    # render opens the window, paced at FPS, and ends the game when it closes
+    while env.running:
+        env.render()
+        env.update(get_keyboard_moves())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import pygame
+
+# (left, right, up, down) pressed for each action of the two player games
+MOVES = (
+    (0, 0, 0, 0),  # Stay
+    (1, 0, 0, 0),  # Left
+    (0, 1, 0, 0),  # Right
+    (0, 0, 1, 0),  # Up
+    (0, 0, 0, 1),  # Down
+    (1, 0, 1, 0),  # Up left
+    (0, 1, 1, 0),  # Up right
+    (1, 0, 0, 1),  # Down left
+    (0, 1, 0, 1),  # Down right
+)
+
+
+def get_keyboard_moves():
+    """Return the (left, right, up, down) keys pressed for each player,
+    WASD for the first one and the arrow keys for the second one"""
+    keys = pygame.key.get_pressed()
+
+    return (
+        (keys[pygame.K_a], keys[pygame.K_d], keys[pygame.K_w], keys[pygame.K_s]),
+        (
+            keys[pygame.K_LEFT],
+            keys[pygame.K_RIGHT],
+            keys[pygame.K_UP],
+            keys[pygame.K_DOWN],
+        ),
+    )
+
+
+class ScoreText:
+    """
+    Description:
+        Score line of a two player game, rendered once per scores.
+    Parameters:
+        _color(int, int, int): Color of the text
+        _font(pygame.font.Font): Font of the scores, loaded on first use
+        _texts(dict): Rendered score surfaces keyed by the scores
+    """
+
+    def __init__(self, color=(255, 255, 255)):
+        self._color = color
+        self._font = None
+        self._texts = {}
+
+    def get(self, scores):
+        """Return the score line surface of scores (int, int)"""
+        text = self._texts.get(scores)
+        if text is None:
+            if self._font is None:
+                # Also needed when drawing offscreen, without pygame.init
+                pygame.font.init()
+                # None means default font
+                self._font = pygame.font.Font(None, 36)
+            text = self._font.render(
+                f"Player 1: {scores[0]} Player 2: {scores[1]}", True, self._color
+            )
+            self._texts[scores] = text
+        return text
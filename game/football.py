@@ -1,6 +1,20 @@
 import pygame
+import os
 import sys
 
+# Get the current script's directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the absolute path to the project's root directory
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+# Add the project's root directory to sys.path
+sys.path.append(project_root)
+
+from baseEnv.env import Env  # noqa: E402
+from baseEnv.pacer import FramePacer  # noqa: E402
+from game.common import MOVES, ScoreText, get_keyboard_moves  # noqa: E402
+
 
 class Colors:
     """
@@ -144,6 +158,14 @@ class Player(GameObject):
         """Add 1 to the score"""
         self._score += 1
 
+    def reset_score(self):
+        """Set the score back to 0"""
+        self._score = 0
+
+    def set_score(self, score):
+        """Set the accumulated score"""
+        self._score = score
+
     def get_score(self):
         """Return player score"""
         return self._score
@@ -163,27 +185,26 @@ class Ball(GameObject):
         _COLOR(int, int, int): displayed color
         _SPEED(float): movement speed on the pitch
         _FRICTION(float): movement dampening factor
-        _INITIAL_POS(int, int)
         _rect(pygame.Rect): rectangular coordinates
         _velocity(pygame.Vector2): velocity vector for movement
         _color(int, int, int): Displayed color
+        _initial_pos(int, int): initial position at kick-off
     """
 
     _SIZE = 10
     _COLOR = Colors.WHITE
     _SPEED = 1.5
     _FRICTION = 0.75
-    _INITIAL_POS = (0, 0)
 
     def __init__(self, pitch):
-        Ball._INITIAL_POS = pitch.get_rect().center
-        self._rect = pygame.Rect(Ball._INITIAL_POS, (Ball._SIZE, Ball._SIZE))
+        self._initial_pos = pitch.get_rect().center
+        self._rect = pygame.Rect(self._initial_pos, (Ball._SIZE, Ball._SIZE))
         self._velocity = pygame.Vector2()
         self._color = Ball._COLOR
 
     def reset(self):
         """Reset velocity and position"""
-        self._rect.center = Ball._INITIAL_POS
+        self._rect.center = self._initial_pos
         self._velocity.update()
 
     def bounce(self, x, y):
@@ -209,6 +230,7 @@ class Game:
         _goals(pygame.Rect): Rect objects where the ball is scored
         _players(list(Player)): List of players objects
         _ball(Ball): Ball object
+        _score_text(ScoreText): Rendered score line of each scores
     """
 
     def __init__(self, screen):
@@ -219,26 +241,45 @@ class Game:
         self._players = (Player(self._pitch, 1, 0), Player(self._pitch, 0, 1))
         self._ball = Ball(self._pitch)
 
-    def move_players(self):
+        self._score_text = ScoreText()
+
+    def reset(self):
+        """Reset ball, players and scores to kick-off"""
+        self._ball.reset()
+        for player in self._players:
+            player.reset()
+            player.reset_score()
+
+    def get_scores(self):
+        """Return the score of each player"""
+        return (self._players[0].get_score(), self._players[1].get_score())
+
+    def get_pitch(self):
+        """Return the pitch"""
+        return self._pitch
+
+    def get_goals(self):
+        """Return the goals"""
+        return self._goals
+
+    def get_players(self):
+        """Return the players"""
+        return self._players
+
+    def get_ball(self):
+        """Return the ball"""
+        return self._ball
+
+    def move_players(self, moves=None):
         # Move the players and update their velocities
         # checking for wall collisions
-        keys = pygame.key.get_pressed()
-
-        self._players[0].move(
-            self._pitch.get_rect(),
-            keys[pygame.K_a],
-            keys[pygame.K_d],
-            keys[pygame.K_w],
-            keys[pygame.K_s],
-        )
+        # moves holds a (left, right, up, down) tuple per player,
+        # read from the keyboard when not given
+        if moves is None:
+            moves = get_keyboard_moves()
 
-        self._players[1].move(
-            self._pitch.get_rect(),
-            keys[pygame.K_LEFT],
-            keys[pygame.K_RIGHT],
-            keys[pygame.K_UP],
-            keys[pygame.K_DOWN],
-        )
+        for player, move in zip(self._players, moves):
+            player.move(self._pitch.get_rect(), *move)
 
     def move_ball(self):
         ball_rect = self._ball.get_rect()
@@ -305,66 +346,211 @@ class Game:
                     elif ball_rect.bottom == self._screen.get_rect().bottom:
                         player_rect.bottom = ball_rect.top
 
-    def draw_GameObjects(self):
-        # Draw everything
-        self._screen.fill(Colors.BLACK)
+    def draw_background(self, surface):
+        """
+        Description:
+            Draws the parts that only change on a goal: the pitch, the goals
+            and the scores
 
-        self._pitch.draw(self._screen)
-        for goal in self._goals:
-            goal.draw(self._screen)
-        for player in self._players:
-            player.draw(self._screen)
-        self._ball.draw(self._screen)
-
-    def draw_UI(self):
-        # Draw scores
-        font = pygame.font.Font(None, 36)
-        text = font.render(
-            f"Player 1: {self._players[0].get_score()} "
-            f"Player 2: {self._players[1].get_score()}",
-            True,
-            (255, 255, 255),
-        )
-        self._screen.blit(text, (20, 20))
+        Parameters:
+            surface (pygame.Surface): Surface to draw on
 
-    def step(self):
-        self.move_players()
+        Returns:
+            rects (list(pygame.Rect)): The area of the scores
+        """
+        surface.fill(Colors.BLACK)
+        self._pitch.draw(surface)
+        for goal in self._goals:
+            goal.draw(surface)
+        return [self.draw_UI(surface)]
+
+    def draw_GameObjects(self, surface):
+        """
+        Description:
+            Draws the players and the ball
+
+        Parameters:
+            surface (pygame.Surface): Surface to draw on
+
+        Returns:
+            rects (list(pygame.Rect)): The areas drawn on
+        """
+        rects = []
+        for game_object in self._players + (self._ball,):
+            game_object.draw(surface)
+            rects.append(game_object.get_rect().copy())
+        return rects
+
+    def draw_UI(self, surface):
+        """Draw the scores, returns the area drawn on"""
+        return surface.blit(self._score_text.get(self.get_scores()), (20, 20))
+
+    def update(self, moves=None):
+        """Advance the game logic one tick, without drawing"""
+        self.move_players(moves)
         self.move_ball()
         self.check_for_scoring()
         self.ensure_no_clipping()
-        self.draw_GameObjects()
-        self.draw_UI()
 
+    def draw(self):
+        """Draw the whole game on its screen"""
+        self.draw_background(self._screen)
+        self.draw_GameObjects(self._screen)
 
-def main():
-    # Initialize Pygame
-    pygame.init()
+    def step(self):
+        self.update()
+        self.draw()
+
+
+class FootballEnv(Env):
+    """
+    Description:
+        Two player football game as an environment.
+        Each player takes one of the actions in FootballEnv.MOVES per step.
+        step only updates the game logic, nothing is drawn until render is
+        called, so matches can be simulated without a display.
+
+    Parameters:
+        envName (str): The name of the environment
+        width (int): The width of the environment window
+        height (int): The height of the environment window
+        max_steps (int): The number of steps a match lasts
+    """
+
+    # (left, right, up, down) pressed for each action, see game.common
+    MOVES = MOVES
+
+    def __init__(self, envName, width=640, height=480, max_steps=3600):
+        """
+        Description:
+            Initializes the environment
+
+        Parameters:
+            envName (str): The name of the environment
+            width (int): The width of the environment window
+            height (int): The height of the environment window
+            max_steps (int): The number of steps a match lasts
+        """
+        super().__init__(envName, width, height)
+
+        self.action_space = list(range(len(FootballEnv.MOVES)))
+        self.max_steps = max_steps
+
+        # The game runs on an offscreen surface, render draws it through the
+        # Env dirty rectangle pipeline
+        self.game = Game(pygame.Surface(self.window_size))
+
+        # Render at the 60 ticks per second the game is designed for
+        self.pacer = FramePacer(60)
+
+        self.reset()
+
+    def reset(self, show_display=pygame.SHOWN, seed=None):
+        """
+        Description:
+            Resets the match to kick-off with both scores at 0
+
+        Parameters:
+            show_display (int): pygame.SHOWN or pygame.HIDDEN
+            seed (int): If given, reseeds the environment's np_random
+
+        Returns:
+            state (tuple): The new state of the environment
+        """
+        super().reset(show_display, seed)
+
+        self.reward = (0, 0)
+        self.episode_length = 0
+        self.game.reset()
+
+        return self.get_state()
+
+    def get_state(self):
+        """
+        Description:
+            Returns the state of the match
+
+        Returns:
+            state (tuple): Center of each player, center of the ball and
+                velocity of the ball
+        """
+        player_1, player_2 = self.game.get_players()
+        ball = self.game.get_ball()
+        return (
+            *player_1.get_rect().center,
+            *player_2.get_rect().center,
+            *ball.get_rect().center,
+            *ball.get_velocity(),
+        )
+
+    def step(self, actions):
+        """
+        Description:
+            Moves the match one tick forward
 
-    # Set up some constants
-    WIDTH, HEIGHT = 640, 480
-    FPS = 60  # Frames per second
+        Parameters:
+            actions (tuple(int, int)): The action of each player
 
-    # Set up the display
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        Returns:
+            state (tuple): The new state of the environment
+            reward (tuple(int, int)): 1 for the player that scored on this
+                step, -1 for the one that conceded, 0 otherwise
+            done (bool): Whether the match is over
+        """
+        players = self.game.get_players()
+        scores = [player.get_score() for player in players]
 
-    # Set up the game
-    game = Game(screen)
+        self.game.update((FootballEnv.MOVES[actions[0]], FootballEnv.MOVES[actions[1]]))
 
-    # Create a clock object
-    clock = pygame.time.Clock()
+        goals = [player.get_score() - score for player, score in zip(players, scores)]
+        self.reward = (goals[0] - goals[1], goals[1] - goals[0])
 
-    while True:
-        clock.tick(FPS)  # This will delay the loop to run at 60 FPS
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                print("\nGame Finished")
-                sys.exit()
+        self.episode_length += 1
+        done = self.episode_length >= self.max_steps
+
+        return self.get_state(), self.reward, done
+
+    def draw_background(self, surface):
+        """Draws the pitch, goals and scores, see Env.draw_background."""
+        return self.game.draw_background(surface)
+
+    def get_background_key(self):
+        """The background is drawn again when a player scores."""
+        return self.game.get_scores()
+
+    def render(self, mode="human"):
+        """
+        Description:
+            Renders the environment
+
+        Parameters:
+            mode (str): "human" or "rgb_array", see Env.render
+
+        Returns:
+            frame (np.ndarray): The frame in "rgb_array" mode
+        """
+        if mode == "rgb_array":
+            offscreen = self.get_offscreen()
+            offscreen.blit(self.get_background(), (0, 0))
+            self.game.draw_GameObjects(offscreen)
+            return super().render(mode)
+
+        display = self.begin_frame()
+        self.submit_rects(self.game.draw_GameObjects(display))
+
+        super().render(mode)
+
+
+def main():
+    # Set up the game, render opens the window, paced at 60 FPS
+    env = FootballEnv("Football")
 
-        game.step()
+    # Play until the window is closed
+    while env.running:
+        env.render()
+        env.game.update()
 
-        # Flip the display
-        pygame.display.flip()
+    print("\nGame Finished")
 
 
 if __name__ == "__main__":
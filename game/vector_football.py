@@ -0,0 +1,315 @@
+import numpy as np
+import pygame
+import os
+import sys
+
+# Get the current script's directory
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Construct the absolute path to the project's root directory
+project_root = os.path.abspath(os.path.join(current_dir, ".."))
+
+# Add the project's root directory to sys.path
+sys.path.append(project_root)
+
+from baseEnv.env import Env  # noqa: E402
+from baseEnv.pacer import FramePacer  # noqa: E402
+from baseEnv.vector import step_subset  # noqa: E402
+from game.football import FootballEnv, Game, Player  # noqa: E402
+
+
+def colliderect(pos_a, size_a, pos_b, size_b):
+    """pygame.Rect.colliderect for (M, 2) arrays of top-left corners."""
+    return np.all((pos_a < pos_b + size_b) & (pos_a + size_a > pos_b), axis=-1)
+
+
+class VectorFootballEnv(Env):
+    """
+    Description:
+        Many football matches simulated together as NumPy arrays.
+        Follows the rules of Game: integer positions like pygame.Rect, wall
+        bounces, player-ball contacts, 0.95 ball friction and goals, but the
+        players and ball of every match live in arrays and each rule is one
+        array operation over all matches. Matches that end are reset on the
+        same step, the state they finished in is kept in final_state.
+
+    Parameters:
+        envName (str): The name of the environment
+        num_envs (int): The number of matches to simulate
+        width (int): The width of the environment window
+        height (int): The height of the environment window
+        max_steps (int): The number of steps a match lasts
+    """
+
+    FRICTION = 0.95
+
+    # Arrays holding the state of each match, see step
+    STATE_ARRAYS = (
+        "player_pos",
+        "player_vel",
+        "ball_pos",
+        "ball_vel",
+        "score",
+        "episode_length",
+        "final_state",
+    )
+
+    def __init__(self, envName, num_envs, width=640, height=480, max_steps=3600):
+        """
+        Description:
+            Initializes the environment
+
+        Parameters:
+            envName (str): The name of the environment
+            num_envs (int): The number of matches to simulate
+            width (int): The width of the environment window
+            height (int): The height of the environment window
+            max_steps (int): The number of steps a match lasts
+        """
+        super().__init__(envName, width, height)
+
+        self.num_envs = num_envs
+        self.action_space = list(range(len(FootballEnv.MOVES)))
+        self.max_steps = max_steps
+
+        # Take the pitch geometry from a regular game, also used to render
+        self.game = Game(pygame.Surface(self.window_size))
+        self.game.reset()
+        pitch = self.game.get_pitch().get_rect()
+        players = self.game.get_players()
+        ball = self.game.get_ball().get_rect()
+
+        self.pitch_min = np.array(pitch.topleft)
+        self.pitch_max = np.array(pitch.bottomright)
+        self.goal_pos = np.array(
+            [goal.get_rect().topleft for goal in self.game.get_goals()]
+        )
+        self.goal_size = np.array(
+            [goal.get_rect().size for goal in self.game.get_goals()]
+        )
+        self.player_size = np.array(players[0].get_rect().size)
+        self.player_start = np.array([player.get_rect().topleft for player in players])
+        self.ball_size = np.array(ball.size)
+        self.ball_start = np.array(ball.topleft)
+
+        # Velocity of each action, as Player.move computes it
+        moves = np.array(FootballEnv.MOVES)
+        self.action_velocity = Player._SPEED * np.stack(
+            (moves[:, 1] - moves[:, 0], moves[:, 3] - moves[:, 2]), axis=1
+        )
+
+        self.pacer = FramePacer(60)
+
+        self.reset()
+
+    def reset(self, show_display=pygame.SHOWN, seed=None):
+        """
+        Description:
+            Resets every match to kick-off with both scores at 0
+
+        Parameters:
+            show_display (int): pygame.SHOWN or pygame.HIDDEN
+            seed (int): If given, reseeds the environment's np_random
+
+        Returns:
+            state (np.ndarray): (num_envs, 8) array with the new states
+        """
+        super().reset(show_display, seed)
+
+        m = self.num_envs
+        self.player_pos = np.broadcast_to(self.player_start, (m, 2, 2)).copy()
+        self.player_vel = np.zeros((m, 2, 2), dtype=np.int64)
+        self.ball_pos = np.broadcast_to(self.ball_start, (m, 2)).copy()
+        self.ball_vel = np.zeros((m, 2))
+        self.score = np.zeros((m, 2), dtype=np.int64)
+        self.episode_length = np.zeros(m, dtype=np.int64)
+        self.final_state = self.get_state()
+
+        return self.final_state.copy()
+
+    def get_state(self, indices=None):
+        """
+        Description:
+            Returns the state of every match, or of the given ones
+
+        Parameters:
+            indices (np.ndarray): Indices of the matches, all of them if None
+
+        Returns:
+            state (np.ndarray): (num_envs, 8) array with the center of each
+                player, center of the ball and velocity of the ball, in the
+                same order as FootballEnv.get_state. (len(indices), 8) with
+                indices
+        """
+        rows = slice(None) if indices is None else indices
+        return np.concatenate(
+            (
+                (self.player_pos[rows] + self.player_size // 2).reshape(-1, 4),
+                self.ball_pos[rows] + self.ball_size // 2,
+                self.ball_vel[rows],
+            ),
+            axis=1,
+        )
+
+    def kick_off(self, matches):
+        """Send the ball and players of the given matches back to kick-off."""
+        self.player_pos[matches] = self.player_start
+        self.player_vel[matches] = 0
+        self.ball_pos[matches] = self.ball_start
+        self.ball_vel[matches] = 0
+
+    def reset_envs(self, indices):
+        """
+        Description:
+            Resets some of the matches to kick-off with both scores at 0
+
+        Parameters:
+            indices (np.ndarray): Indices of the matches to reset
+
+        Returns:
+            state (np.ndarray): (len(indices), 8) array with their new states
+        """
+        self.kick_off(indices)
+        self.score[indices] = 0
+        self.episode_length[indices] = 0
+        self.final_state[indices] = self.get_state(indices)
+        return self.final_state[indices]
+
+    def step(self, actions, indices=None):
+        """
+        Description:
+            Moves every match, or the given ones, one tick forward
+
+        Parameters:
+            actions (np.ndarray): (num_envs, 2) array with the action of each
+                player of each match, or (len(indices), 2) with indices
+            indices (np.ndarray): Indices of the matches to step, all of them
+                if None. The others don't move
+
+        Returns:
+            state (np.ndarray): (num_envs, 8) array with the new states,
+                finished matches already hold their reset state, the state
+                they finished in is in final_state
+            reward (np.ndarray): (num_envs, 2) array, 1 for the player that
+                scored on this step, -1 for the one that conceded, 0 otherwise
+            done (np.ndarray): (num_envs,) bool array, True where the match
+                ended on this step
+            With indices, the rows of the stepped matches only
+        """
+        if indices is not None:
+            return step_subset(self, actions, indices)
+
+        # Move the players inside the pitch
+        self.player_vel = self.action_velocity[np.asarray(actions)]
+        self.player_pos = np.clip(
+            self.player_pos + self.player_vel,
+            self.pitch_min,
+            self.pitch_max - self.player_size,
+        )
+
+        # Move the ball, pygame.Rect truncates the velocity towards zero
+        self.ball_pos += np.trunc(self.ball_vel).astype(np.int64)
+
+        # Collide with walls
+        wall = (self.ball_pos < self.pitch_min) | (
+            self.ball_pos + self.ball_size > self.pitch_max
+        )
+        self.ball_vel[wall] *= -1
+
+        # Collide with players, one player after the other like Game
+        for i in range(2):
+            player_pos = self.player_pos[:, i]
+            player_vel = self.player_vel[:, i]
+            hit = colliderect(
+                self.ball_pos, self.ball_size, player_pos, self.player_size
+            )
+            still = hit & ~player_vel.any(axis=1)
+
+            # A still player bounces the ball back out of the side it hit
+            left = (self.ball_pos[:, 0] + self.ball_size[0] // 2) < (
+                player_pos[:, 0] + self.player_size[0] // 2
+            )
+            self.ball_vel[still] *= -1
+            self.ball_pos[still & left, 0] = (
+                player_pos[still & left, 0] - self.ball_size[0]
+            )
+            self.ball_pos[still & ~left, 0] = (
+                player_pos[still & ~left, 0] + self.player_size[0]
+            )
+
+            # A moving player pushes the ball along
+            pushed = hit & ~still
+            self.ball_vel[pushed] += player_vel[pushed]
+
+        # Apply friction
+        self.ball_vel *= VectorFootballEnv.FRICTION
+
+        # Check for scoring, the ball is back at kick-off after the first goal
+        reward = np.zeros((self.num_envs, 2), dtype=np.int64)
+        for i in range(2):
+            goal = colliderect(
+                self.ball_pos, self.ball_size, self.goal_pos[i], self.goal_size[i]
+            )
+            if goal.any():
+                self.kick_off(goal)
+                scorer = 1 - i
+                self.score[goal, scorer] += 1
+                reward[goal, scorer] += 1
+                reward[goal, i] -= 1
+
+        # Keep the ball inside the pitch
+        self.ball_pos = np.clip(
+            self.ball_pos, self.pitch_min, self.pitch_max - self.ball_size
+        )
+
+        self.episode_length += 1
+        done = self.episode_length >= self.max_steps
+        self.final_state = self.get_state()
+        state = self.final_state
+        if done.any():
+            self.kick_off(done)
+            self.score[done] = 0
+            self.episode_length[done] = 0
+            state = self.final_state.copy()
+            state[done] = self.get_state(done)
+
+        return state, reward, done
+
+    def draw_background(self, surface):
+        """Draws the pitch, goals and scores, see Env.draw_background."""
+        return self.game.draw_background(surface)
+
+    def get_background_key(self):
+        """The background is drawn again when the scores shown change."""
+        return self.game.get_scores()
+
+    def render(self, mode="human", index=0):
+        """
+        Description:
+            Renders one of the matches
+
+        Parameters:
+            mode (str): "human" or "rgb_array", see Env.render
+            index (int): The match to render
+
+        Returns:
+            frame (np.ndarray): The frame in "rgb_array" mode
+        """
+        # Put the match in the game, which draws it
+        for player, pos, score in zip(
+            self.game.get_players(), self.player_pos[index], self.score[index]
+        ):
+            player.get_rect().topleft = pos
+            player.set_score(score)
+        self.game.get_ball().get_rect().topleft = self.ball_pos[index]
+
+        if mode == "rgb_array":
+            offscreen = self.get_offscreen()
+            offscreen.blit(self.get_background(), (0, 0))
+            self.game.draw_GameObjects(offscreen)
+            return super().render(mode)
+
+        display = self.begin_frame()
+        self.submit_rects(self.game.draw_GameObjects(display))
+
+        super().render(mode)